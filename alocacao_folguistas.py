@@ -0,0 +1,88 @@
+import numpy as np
+from escala_generator import TRABALHO, calcular_matriz_escala, obter_colunas_dias
+from validacao_escala import MAX_DIAS_CONSECUTIVOS
+
+FUNCOES_COBERTAS = ('Caixa', 'Frentista')
+ORDEM_TURNOS = {'Turno 1': 0, 'Turno 2': 1, 'Turno 3': 2}
+
+def rotulo_folguista(nome):
+    return f"{nome} (CP)"
+
+def turnos_compativeis(turno_anterior, turno):
+    # Sem descanso suficiente ao voltar para um turno mais cedo no dia seguinte (ex.: Turno 3 -> Turno 1)
+    if turno_anterior is None:
+        return True
+    return ORDEM_TURNOS.get(turno, 0) >= ORDEM_TURNOS.get(turno_anterior, 0)
+
+def identificar_vagas(cobertura, funcoes=FUNCOES_COBERTAS):
+    # Para cada dia, os funcionários das funções cobertas que não estão trabalhando
+    vagas = []
+    for dia in range(cobertura.calendario.num_dias):
+        linhas = np.concatenate([cobertura.ausentes(dia, funcao=funcao) for funcao in funcoes])
+        vagas.append([(cobertura.nomes[i], cobertura.turnos[i], cobertura.horarios[i]) for i in linhas.tolist()])
+    return vagas
+
+def _aumentar(folguista, candidatos, vaga_de, visitadas):
+    # Caminho aumentante de Kuhn a partir de um folguista
+    for vaga in candidatos[folguista]:
+        if vaga in visitadas:
+            continue
+        visitadas.add(vaga)
+        if vaga_de[vaga] is None or _aumentar(vaga_de[vaga], candidatos, vaga_de, visitadas):
+            vaga_de[vaga] = folguista
+            return True
+    return False
+
+def emparelhar_dia(vagas_dia, turnos_anteriores):
+    # Emparelhamento máximo folguista x vaga do dia; retorna {folguista: índice da vaga}
+    candidatos = []
+    for turno_anterior in turnos_anteriores:
+        compativeis = [i for i, (_, turno, _) in enumerate(vagas_dia) if turnos_compativeis(turno_anterior, turno)]
+        # Preferir manter o folguista no mesmo turno do dia anterior
+        compativeis.sort(key=lambda i: vagas_dia[i][1] != turno_anterior)
+        candidatos.append(compativeis)
+
+    vaga_de = [None] * len(vagas_dia)
+    for folguista in range(len(turnos_anteriores)):
+        _aumentar(folguista, candidatos, vaga_de, set())
+
+    return {folguista: vaga for vaga, folguista in enumerate(vaga_de) if folguista is not None}
+
+def alocar_folguistas(cobertura, folguistas, funcoes=FUNCOES_COBERTAS):
+    # Preenche a grade dos folguistas cobrindo as folgas do período do índice de cobertura
+    if cobertura.calendario is None:
+        return [{'Folguista': rotulo_folguista(nome)} for nome in folguistas], []
+
+    colunas = obter_colunas_dias(cobertura.calendario)
+    registros = [dict.fromkeys(colunas, '') for _ in folguistas]
+    descobertas = []
+    turnos_anteriores = [None] * len(folguistas)
+
+    # Os folguistas também têm folgas: cada um segue o próprio ciclo 5x1, com um domingo de folga por mês,
+    # e nunca passa do limite de dias de trabalho seguidos da validação
+    disponivel = calcular_matriz_escala(len(folguistas), cobertura.calendario) == TRABALHO
+    consecutivos = [0] * len(folguistas)
+
+    for dia, vagas_dia in enumerate(identificar_vagas(cobertura, funcoes)):
+        livres = [
+            folguista for folguista in range(len(folguistas))
+            if disponivel[folguista, dia] and consecutivos[folguista] < MAX_DIAS_CONSECUTIVOS
+        ]
+        alocacao = {
+            livres[indice]: vaga
+            for indice, vaga in emparelhar_dia(vagas_dia, [turnos_anteriores[folguista] for folguista in livres]).items()
+        }
+        turnos_anteriores = [None] * len(folguistas)
+        consecutivos = [consecutivos[folguista] + 1 if folguista in alocacao else 0 for folguista in range(len(folguistas))]
+        for folguista, vaga in alocacao.items():
+            nome, turno, horario = vagas_dia[vaga]
+            registros[folguista][colunas[dia]] = f"{turno}: {horario} - {nome}"
+            turnos_anteriores[folguista] = turno
+        cobertas = set(alocacao.values())
+        descobertas.extend((colunas[dia], vagas_dia[i][0]) for i in range(len(vagas_dia)) if i not in cobertas)
+
+    registros = [
+        {'Folguista': rotulo_folguista(nome), **registro}
+        for nome, registro in zip(folguistas, registros)
+    ]
+    return registros, descobertas
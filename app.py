@@ -1,6 +1,7 @@
+import sys
 import streamlit as st
-from pages import cadastro_empresa, cadastro_funcionario, cadastro_folguista, gerar_escala, gerar_escala_folguista
-from data_manager import carregar_empresas
+from pages import PAGINAS, carregar_pagina
+from data_manager import RepositorioEmpresas, registrar_observador
 
 # Função para remover o menu
 def remove_menu():
@@ -28,24 +29,32 @@ def load_css(file_name):
 
 load_css('styles/main.css')
 
+def _invalidar_escalas(evento, nome_empresa):
+    # Só há escalas em cache se alguma página já importou o gerador
+    gerador = sys.modules.get('escala_generator')
+    if gerador is not None:
+        gerador.invalidar_escalas(nome_empresa)
+    # Os DataFrames em cache também mantêm vivas as escalas descartadas
+    utilitarios = sys.modules.get('utils')
+    if utilitarios is not None:
+        utilitarios.obter_dataframe_escala.cache_clear()
+
+# Repositório único por processo, compartilhado por todas as sessões
+@st.cache_resource
+def obter_repositorio_empresas():
+    # Escalas geradas de uma empresa deixam de valer quando ela é alterada ou recarregada
+    registrar_observador(_invalidar_escalas)
+    return RepositorioEmpresas()
+
 # Inicializar st.session_state.empresas
 if 'empresas' not in st.session_state:
-    st.session_state.empresas = carregar_empresas()
-
-# Definir ícones para cada página
-PAGES = {
-    "🏢 Cadastro de Empresa": cadastro_empresa,
-    "👤 Cadastro de Funcionário": cadastro_funcionario,
-    "🔄 Cadastro de Folguista": cadastro_folguista,
-    "📅 Gerar Escala": gerar_escala,
-    "📊 Gerar Escala Folguista": gerar_escala_folguista
-}
+    st.session_state.empresas = obter_repositorio_empresas()
 
 st.sidebar.title('🧭 Navegação')
 st.sidebar.markdown('---')
 
 # Criar botões de navegação
-for name, page_func in PAGES.items():
+for name in PAGINAS:
     if st.sidebar.button(name):
         st.session_state.page = name
 
@@ -53,8 +62,8 @@ for name, page_func in PAGES.items():
 if 'page' not in st.session_state:
     st.session_state.page = "🏢 Cadastro de Empresa"
 
-# Chamar a função app() da página selecionada
-PAGES[st.session_state.page]()
+# Importar (na primeira vez) e chamar a função app() da página selecionada
+carregar_pagina(st.session_state.page)()
 
 # Adicionar informações no rodapé
 st.sidebar.markdown('---')
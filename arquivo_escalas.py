@@ -0,0 +1,130 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from escala_generator import ROTULOS, TRABALHO
+
+pasta_arquivo = os.path.join('data', 'arquivo_escalas')
+
+# Uma linha por funcionário e dia; textos repetidos ficam como dicionário (índice + tabela de valores)
+ESQUEMA_ARQUIVO = pa.schema([
+    ('empresa', pa.dictionary(pa.int32(), pa.string())),
+    ('ano', pa.int16()),
+    ('mes', pa.int8()),
+    ('turno', pa.dictionary(pa.int8(), pa.string())),
+    ('funcao', pa.dictionary(pa.int8(), pa.string())),
+    ('funcionario_id', pa.int64()),
+    ('funcionario', pa.dictionary(pa.int32(), pa.string())),
+    ('data', pa.date32()),
+    ('codigo', pa.uint8()),
+    ('rotulo', pa.dictionary(pa.int32(), pa.string())),
+])
+PARTICAO = ds.partitioning(
+    pa.schema([('empresa', pa.string()), ('ano', pa.int16()), ('mes', pa.int8())]), flavor='hive'
+)
+
+def _dicionario(valores, tipo):
+    indices, unicos = pd.factorize(pd.Series(valores, dtype=object), use_na_sentinel=False)
+    return pa.DictionaryArray.from_arrays(pa.array(indices, type=tipo.index_type), pa.array(unicos, type=pa.string()))
+
+def _repetir(valores, tipo, vezes):
+    # Valor por linha da escala repetido para cada dia, ainda codificado como dicionário
+    dicionario = _dicionario(valores, tipo)
+    return pa.DictionaryArray.from_arrays(np.repeat(dicionario.indices.to_numpy(), vezes), dicionario.dictionary)
+
+def tabela_escala(nome_empresa, escala):
+    num_linhas, num_dias = escala.codigos.shape
+    total = num_linhas * num_dias
+
+    # Tabela de rótulos: as ausências pelo código, o trabalho pelo rótulo da linha e, por fim, os ajustes
+    rotulos_trabalho = [f"{turno}: {horario}" for turno, horario in zip(escala.turnos, escala.horarios)]
+    rotulos = list(ROTULOS.values())
+    indice_rotulo = {rotulo: i for i, rotulo in enumerate(rotulos)}
+    for rotulo in rotulos_trabalho + list(escala.ajustes.values()):
+        if rotulo not in indice_rotulo:
+            indice_rotulo[rotulo] = len(rotulos)
+            rotulos.append(rotulo)
+    por_codigo = np.zeros(max(ROTULOS) + 1, dtype=np.int32)
+    por_codigo[list(ROTULOS)] = [indice_rotulo[rotulo] for rotulo in ROTULOS.values()]
+    trabalho = np.array([indice_rotulo[rotulo] for rotulo in rotulos_trabalho], dtype=np.int32)
+    indices = np.where(escala.codigos == TRABALHO, trabalho[:, np.newaxis], por_codigo[escala.codigos])
+    for (linha, dia), rotulo in escala.ajustes.items():
+        indices[linha, dia] = indice_rotulo[rotulo]
+
+    datas = np.tile(escala.calendario.datas, num_linhas)
+    meses = datas.astype('datetime64[M]').astype(np.int64)
+    return pa.Table.from_arrays([
+        pa.DictionaryArray.from_arrays(np.zeros(total, dtype=np.int32), pa.array([nome_empresa])),
+        pa.array(meses // 12 + 1970, type=pa.int16()),
+        pa.array(meses % 12 + 1, type=pa.int8()),
+        _repetir(escala.turnos, ESQUEMA_ARQUIVO.field('turno').type, num_dias),
+        _repetir(escala.funcoes, ESQUEMA_ARQUIVO.field('funcao').type, num_dias),
+        pa.array(np.repeat(np.array(escala.ids, dtype=object), num_dias), type=pa.int64()),
+        _repetir(escala.nomes, ESQUEMA_ARQUIVO.field('funcionario').type, num_dias),
+        pa.array(datas, type=pa.date32()),
+        pa.array(escala.codigos.ravel(), type=pa.uint8()),
+        pa.DictionaryArray.from_arrays(indices.ravel(), pa.array(rotulos, type=pa.string())),
+    ], schema=ESQUEMA_ARQUIVO)
+
+def tabela_escalas(nome_empresa, escalas):
+    return pa.concat_tables([tabela_escala(nome_empresa, escala) for escala in escalas]).unify_dictionaries()
+
+def arquivar_escalas(nome_empresa, escalas, pasta=None):
+    # Particionado em empresa=/ano=/mes=; arquivar um mês de novo substitui o que havia nele
+    tabela = tabela_escalas(nome_empresa, escalas)
+    ds.write_dataset(
+        tabela, pasta or pasta_arquivo, format='parquet', partitioning=PARTICAO,
+        existing_data_behavior='delete_matching', basename_template='escala-{i}.parquet',
+        file_options=ds.ParquetFileFormat().make_write_options(compression='zstd')
+    )
+    return tabela
+
+def escala_para_parquet(nome_empresa, escalas):
+    # Um único arquivo Parquet em memória, para download
+    buffer = io.BytesIO()
+    pq.write_table(tabela_escalas(nome_empresa, escalas), buffer, compression='zstd')
+    return buffer.getvalue()
+
+def carregar_escalas(empresa=None, ano=None, mes=None, turnos=None, colunas=None, pasta=None):
+    # Os filtros de empresa/ano/mês só abrem as partições correspondentes
+    pasta = pasta or pasta_arquivo
+    if not os.path.isdir(pasta):
+        return ESQUEMA_ARQUIVO.empty_table()
+    filtro = None
+    for campo, valor in (('empresa', empresa), ('ano', ano), ('mes', mes)):
+        if valor is not None:
+            condicao = ds.field(campo) == valor
+            filtro = condicao if filtro is None else filtro & condicao
+    if turnos:
+        condicao = ds.field('turno').isin(list(turnos))
+        filtro = condicao if filtro is None else filtro & condicao
+    dataset = ds.dataset(pasta, format='parquet', partitioning=PARTICAO)
+    return dataset.to_table(columns=colunas, filter=filtro)
+
+def escala_arquivada_para_dataframe(tabela):
+    # Volta ao formato da tela: uma linha por funcionário e uma coluna por data
+    if not tabela.num_rows:
+        return pd.DataFrame(columns=['Funcionário'])
+    df = tabela.select(['turno', 'funcionario', 'data', 'rotulo']).to_pandas()
+    df['data'] = df['data'].astype(str)
+    # Funcionários na ordem em que foram arquivados e datas em ordem cronológica
+    linhas = pd.MultiIndex.from_frame(df[['turno', 'funcionario']].astype(object).drop_duplicates())
+    df_escala = df.pivot(index=['turno', 'funcionario'], columns='data', values='rotulo')
+    df_escala = df_escala.reindex(index=linhas, columns=sorted(df_escala.columns))
+    df_escala = df_escala.reset_index(level='turno', drop=True).rename_axis(index='Funcionário', columns=None)
+    return df_escala.reset_index()
+
+def comparar_escalas(anterior, atual):
+    # Células que mudaram entre duas versões arquivadas, pelo funcionário e pela data
+    chaves = ['turno', 'funcionario', 'data']
+    df_anterior = anterior.select(chaves + ['rotulo']).to_pandas()
+    df_atual = atual.select(chaves + ['rotulo']).to_pandas()
+    for df in (df_anterior, df_atual):
+        for coluna in chaves[:2] + ['rotulo']:
+            df[coluna] = df[coluna].astype(object)
+    df = df_anterior.merge(df_atual, on=chaves, how='outer', suffixes=('_anterior', '_atual'))
+    diferentes = df['rotulo_anterior'].ne(df['rotulo_atual']) & ~(df['rotulo_anterior'].isna() & df['rotulo_atual'].isna())
+    return df[diferentes].reset_index(drop=True)
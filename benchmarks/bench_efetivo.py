@@ -0,0 +1,44 @@
+# Tempo para escolher as âncoras que cobrem o efetivo mínimo (otimizar_ancoras_efetivo), que roda ao
+# salvar o efetivo ou cadastrar alguém, com todos começando na mesma fase e mínimo de 80% do grupo.
+# Uso: python benchmarks/bench_efetivo.py [funcionarios ...]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from escala_generator import MESES_OTIMIZACAO_EFETIVO, agrupar_funcionarios_por_funcao, gerar_escala_codificada, otimizar_ancoras_efetivo
+from models import Empresa, Funcionario
+
+def montar_empresa(quantidade):
+    empresa = Empresa('Efetivo')
+    for i in range(quantidade):
+        funcionario = Funcionario(f'C{i}', 'Caixa', 'C', '06:00 as 14:00', '2026-10-01', 'Turno 1', '2026-10-01')
+        funcionario.id = i + 1
+        empresa.adicionar_funcionario(funcionario)
+    minimo = quantidade * 8 // 10
+    empresa.efetivo_minimo = {('Caixa', 'Turno 1'): [minimo] * 6 + [minimo * 3 // 4]}
+    return empresa
+
+def medir(quantidade):
+    empresa = montar_empresa(quantidade)
+    inicio = time.perf_counter()
+    ancoras_ciclo = otimizar_ancoras_efetivo(empresa, data_inicio='2026-11-01')
+    segundos = time.perf_counter() - inicio
+
+    for funcionario in empresa.funcionarios['Turno 1']:
+        funcionario.ancora_ciclo = ancoras_ciclo.get(funcionario.id, funcionario.ancora_ciclo)
+    escala = gerar_escala_codificada(
+        agrupar_funcionarios_por_funcao(empresa.funcionarios['Turno 1']), '2026-11-01', '',
+        meses=MESES_OTIMIZACAO_EFETIVO, minimos={'Caixa': empresa.efetivo_minimo[('Caixa', 'Turno 1')]}
+    )
+    falta = int(sum(falta.sum() for falta in escala.faltas.values()))
+    return segundos, len(ancoras_ciclo), falta
+
+def main():
+    quantidades = [int(valor) for valor in sys.argv[1:]] or [12, 60, 200, 500]
+    for quantidade in quantidades:
+        segundos, movidos, falta = medir(quantidade)
+        print(f'{quantidade} funcionários: {segundos * 1e3:.0f} ms, {movidos} âncoras movidas, falta de {falta} pessoa-dia(s)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# Edições por segundo na grade de folguistas de uma empresa grande: reescrevendo o JSON inteiro a cada
+# clique (como antes do SQLite), com fsync por commit (JANELA_FSYNC_SEGUNDOS = 0) e com os fsyncs
+# agrupados na janela padrão.
+# Uso: python benchmarks/bench_fsync.py [edicoes]
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODIGO = """
+import sys, time
+import data_manager
+from models import Empresa, Funcionario
+janela, edicoes = float(sys.argv[1]), int(sys.argv[2])
+data_manager.JANELA_FSYNC_SEGUNDOS = janela
+data_manager.inserir_empresa(Empresa('Posto'))
+for i in range(2000):
+    data_manager.inserir_funcionario('Posto', Funcionario(f'N{i}', 'Caixa', 'C', '06:00 as 14:00', '2026-10-01', 'Turno 1'))
+inicio = time.perf_counter()
+for i in range(edicoes):
+    data_manager.atualizar_escala_folguistas('Posto', [{'Folguista': 'Z (CP)', 'Dia 1': str(i)}])
+print(f'{edicoes / (time.perf_counter() - inicio):.0f}')
+"""
+
+def medir(janela, edicoes):
+    # Processo e pasta novos por medição: o banco fica em data/ relativo ao diretório atual
+    with tempfile.TemporaryDirectory() as pasta:
+        saida = subprocess.run(
+            [sys.executable, '-c', CODIGO, str(janela), str(edicoes)],
+            cwd=pasta, env={**os.environ, 'PYTHONPATH': RAIZ}, capture_output=True, text=True, check=True
+        )
+    return int(saida.stdout)
+
+def medir_json(edicoes):
+    # Mesma empresa no formato do antigo data/empresas.json, gravada inteira com json.dump a cada edição
+    dados = {'Posto': {
+        'nome': 'Posto',
+        'funcionarios': {
+            'Turno 1': [
+                {'nome': f'N{i}', 'funcao': 'Caixa', 'familia': 'C', 'horario': '06:00 as 14:00',
+                 'data_inicio': '2026-10-01', 'turno': 'Turno 1'}
+                for i in range(2000)
+            ],
+            'Turno 2': [],
+            'Turno 3': [],
+        },
+        'folguistas': [],
+        'folguistas_escala': None,
+    }}
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = os.path.join(pasta, 'empresas.json')
+        inicio = time.perf_counter()
+        for i in range(edicoes):
+            dados['Posto']['folguistas_escala'] = [{'Folguista': 'Z (CP)', 'Dia 1': str(i)}]
+            with open(arquivo, 'w') as file:
+                json.dump(dados, file)
+        return round(edicoes / (time.perf_counter() - inicio))
+
+def main():
+    edicoes = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    print(f'JSON reescrito a cada clique: {medir_json(edicoes)} edições/s')
+    print(f'fsync por commit: {medir(0, edicoes)} edições/s')
+    print(f'fsync agrupado (1 s): {medir(1.0, edicoes)} edições/s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+# Tempo de importação (cumulativo, em ms) dos módulos sem interface, medido com python -X importtime.
+# Uso: python benchmarks/bench_importacao.py [repeticoes]
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULOS = ('data_manager', 'escala_generator', 'escalas')
+
+def tempo_importacao(modulo):
+    saida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+    # Linhas 'import time: self | cumulative | nome'; a do próprio módulo traz o total
+    for linha in saida.stderr.splitlines():
+        partes = [parte.strip() for parte in linha.split('|')]
+        if len(partes) == 3 and partes[2] == modulo:
+            return int(partes[1]) / 1000
+    raise RuntimeError(f'{modulo} não aparece na saída do importtime')
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for modulo in MODULOS:
+        tempos = sorted(tempo_importacao(modulo) for _ in range(repeticoes))
+        print(f'{modulo}: {tempos[len(tempos) // 2]:.1f} ms (mediana de {repeticoes})')
+
+if __name__ == '__main__':
+    main()
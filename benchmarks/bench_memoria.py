@@ -0,0 +1,39 @@
+# Memória por funcionário de um roster grande (tracemalloc) e custo dos codecs to_dict/from_dict.
+# Uso: python benchmarks/bench_memoria.py [funcionarios]
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import Empresa, Funcionario
+
+HORARIOS = ['06:00 as 14:00', '14:00 as 22:00', '22:00 as 06:00']
+
+def montar_roster(quantidade):
+    empresa = Empresa('Grande')
+    for i in range(quantidade):
+        empresa.adicionar_funcionario(Funcionario(
+            f'Funcionario {i}', 'Frentista', 'F', HORARIOS[i % 3], '2024-01-01', f'Turno {i % 3 + 1}', f'2024-01-{i % 28 + 1:02d}'
+        ))
+    return empresa
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    # A primeira montagem aquece os caches (jornadas, horários interpretados) que não contam por funcionário
+    montar_roster(quantidade)
+    tracemalloc.start()
+    empresa = montar_roster(quantidade)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{quantidade} funcionários: {memoria / 1024:.0f} KiB, {memoria / quantidade:.0f} B por funcionário')
+
+    inicio = time.perf_counter()
+    dados = empresa.to_dict()
+    meio = time.perf_counter()
+    Empresa.from_dict(empresa.nome, dados)
+    fim = time.perf_counter()
+    print(f'to_dict {(meio - inicio) * 1e3:.1f} ms, from_dict {(fim - meio) * 1e3:.1f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+# Custo de importação das páginas na primeira renderização: só a página inicial (carregamento
+# sob demanda) contra todas as páginas do registro (como na importação antecipada).
+# Streamlit, pandas e numpy são importados antes do cronômetro, então só os módulos do projeto contam.
+# Uso: python benchmarks/bench_paginas.py [repeticoes]
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODIGO = """
+import sys, time
+import streamlit, pandas, numpy
+inicio = time.perf_counter()
+import data_manager, pages
+rotulos = list(pages.PAGINAS) if sys.argv[1] == 'todas' else [next(iter(pages.PAGINAS))]
+for rotulo in rotulos:
+    pages.carregar_pagina(rotulo)
+print((time.perf_counter() - inicio) * 1e3)
+"""
+
+def medir(modo, repeticoes):
+    tempos = sorted(
+        float(subprocess.run(
+            [sys.executable, '-c', CODIGO, modo], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout)
+        for _ in range(repeticoes)
+    )
+    return tempos[len(tempos) // 2]
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 9
+    print(f'página inicial: {medir("inicial", repeticoes):.1f} ms')
+    print(f'todas as páginas: {medir("todas", repeticoes):.1f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -1,50 +1,621 @@
 import json
+import logging
 import os
-import streamlit as st
-from models import Empresa, Funcionario
+import sqlite3
+import atexit
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from models import Empresa, Funcionario, escolher_ancora_ciclo
+
+logger = logging.getLogger(__name__)
 
 # Atualize o caminho do arquivo
 arquivo_empresas = os.path.join('data', 'empresas.json')
+arquivo_banco = os.path.join('data', 'empresas.db')
+
+# As escritas são anexadas ao WAL do SQLite; o próprio SQLite o copia para o banco a cada tantas
+# páginas (checkpoint automático) e, depois disso, trunca o arquivo para este tamanho
+PAGINAS_CHECKPOINT_WAL = 1000
+LIMITE_WAL_BYTES = 4 * 1024 * 1024
+
+# Os commits no WAL não fazem fsync; um checkpoint feito no fim desta janela torna duráveis
+# todas as edições da rajada de uma vez. Com 0 cada commit faz fsync imediatamente.
+JANELA_FSYNC_SEGUNDOS = 1.0
+
+# Quantas empresas ficam materializadas em memória pelo repositório
+MAX_EMPRESAS_EM_MEMORIA = 32
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS metadados (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+CREATE TABLE IF NOT EXISTS empresas (
+    nome TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS funcionarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    empresa TEXT NOT NULL REFERENCES empresas(nome) ON DELETE CASCADE,
+    nome TEXT NOT NULL,
+    funcao TEXT NOT NULL,
+    familia TEXT NOT NULL,
+    horario TEXT NOT NULL,
+    data_inicio TEXT NOT NULL,
+    turno TEXT NOT NULL,
+    ancora_ciclo TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_funcionarios_empresa_turno_funcao ON funcionarios (empresa, turno, funcao);
+CREATE TABLE IF NOT EXISTS ferias (
+    funcionario_id INTEGER NOT NULL REFERENCES funcionarios(id) ON DELETE CASCADE,
+    inicio TEXT NOT NULL,
+    fim TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ferias_funcionario ON ferias (funcionario_id, inicio);
+CREATE TABLE IF NOT EXISTS ajustes_escala (
+    funcionario_id INTEGER NOT NULL REFERENCES funcionarios(id) ON DELETE CASCADE,
+    data TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    PRIMARY KEY (funcionario_id, data)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS folguistas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    empresa TEXT NOT NULL REFERENCES empresas(nome) ON DELETE CASCADE,
+    nome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_folguistas_empresa ON folguistas (empresa);
+CREATE TABLE IF NOT EXISTS escala_folguistas (
+    empresa TEXT NOT NULL REFERENCES empresas(nome) ON DELETE CASCADE,
+    linha INTEGER NOT NULL,
+    ordem INTEGER NOT NULL,
+    coluna TEXT NOT NULL,
+    valor,
+    PRIMARY KEY (empresa, linha, coluna)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS efetivo_minimo (
+    empresa TEXT NOT NULL REFERENCES empresas(nome) ON DELETE CASCADE,
+    funcao TEXT NOT NULL,
+    turno TEXT NOT NULL,
+    dia_semana INTEGER NOT NULL,
+    minimo INTEGER NOT NULL,
+    PRIMARY KEY (empresa, funcao, turno, dia_semana)
+) WITHOUT ROWID;
+"""
+
+class ErroPersistencia(Exception):
+    pass
+
+def _falha(mensagem, erro):
+    logger.error("%s: %s", mensagem, erro)
+    return ErroPersistencia(f"{mensagem}: {str(erro)}")
+
+# Observadores recebem (evento, nome_empresa) após cada alteração gravada ou empresa recarregada;
+# a interface usa isso para invalidar caches sem que esta camada dependa dela
+_observadores = []
+
+def registrar_observador(observador):
+    if observador not in _observadores:
+        _observadores.append(observador)
+
+def _emitir(evento, nome_empresa=None):
+    logger.info("%s: %s", evento, nome_empresa)
+    for observador in list(_observadores):
+        observador(evento, nome_empresa)
+
+_local = threading.local()
+_trava_sincronismo = threading.Lock()
+_sincronismo_agendado = None
+_trava_conexoes = threading.Lock()
+# Por banco, pares [thread dona, conexão]; a conexão de uma thread que terminou é reaproveitada
+_conexoes = {}
+_bancos_preparados = set()
+
+def _abrir_conexao(caminho):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    # A conexão pode passar para outra thread depois que a dona termina, nunca para duas ao mesmo tempo
+    conexao = sqlite3.connect(caminho, check_same_thread=False)
+    conexao.execute('PRAGMA journal_mode = WAL')
+    conexao.execute(f'PRAGMA wal_autocheckpoint = {PAGINAS_CHECKPOINT_WAL}')
+    conexao.execute(f'PRAGMA journal_size_limit = {LIMITE_WAL_BYTES}')
+    conexao.execute(f"PRAGMA synchronous = {'NORMAL' if JANELA_FSYNC_SEGUNDOS > 0 else 'FULL'}")
+    conexao.execute('PRAGMA foreign_keys = ON')
+    return conexao
+
+def _preparar_banco(caminho, conexao):
+    # Esquema, atualizações e migração do JSON rodam uma vez por processo e banco
+    with _trava_conexoes:
+        if caminho in _bancos_preparados:
+            return
+        conexao.executescript(ESQUEMA)
+        _atualizar_esquema(conexao)
+        _migrar_json(conexao)
+        _bancos_preparados.add(caminho)
+
+# O Streamlit roda cada execução do script em uma thread nova: cada thread usa uma conexão só sua
+# e, quando ela termina, a próxima thread herda a conexão, então o pool fica do tamanho da concorrência
+def _conexao():
+    caminho = os.path.abspath(arquivo_banco)
+    atual = getattr(_local, 'conexao', None)
+    if atual is not None and atual[0] == caminho:
+        return atual[1]
+
+    thread = threading.current_thread()
+    conexao = None
+    with _trava_conexoes:
+        for registro in _conexoes.setdefault(caminho, []):
+            if not registro[0].is_alive():
+                registro[0] = thread
+                conexao = registro[1]
+                break
+    if conexao is None:
+        conexao = _abrir_conexao(caminho)
+        with _trava_conexoes:
+            _conexoes[caminho].append([thread, conexao])
+    elif conexao.in_transaction:
+        conexao.rollback()
+    _preparar_banco(caminho, conexao)
+    _local.conexao = (caminho, conexao)
+    return conexao
+
+def _apos_escrita(conexao):
+    if JANELA_FSYNC_SEGUNDOS > 0:
+        _agendar_sincronismo()
+
+def _agendar_sincronismo():
+    global _sincronismo_agendado
+    with _trava_sincronismo:
+        if _sincronismo_agendado is None:
+            _sincronismo_agendado = threading.Timer(JANELA_FSYNC_SEGUNDOS, sincronizar_banco, (os.path.abspath(arquivo_banco),))
+            _sincronismo_agendado.daemon = True
+            _sincronismo_agendado.start()
+
+def sincronizar_banco(caminho=None):
+    # Checkpoint do WAL: faz fsync de todas as edições pendentes de uma vez
+    global _sincronismo_agendado
+    with _trava_sincronismo:
+        _sincronismo_agendado = None
+    conexao = sqlite3.connect(caminho or arquivo_banco)
+    try:
+        conexao.execute('PRAGMA wal_checkpoint(PASSIVE)')
+    finally:
+        conexao.close()
+
+def _sincronizar_ao_sair():
+    agendado = _sincronismo_agendado
+    if agendado is not None:
+        agendado.cancel()
+        sincronizar_banco(*agendado.args)
+
+atexit.register(_sincronizar_ao_sair)
+
+def compactar_banco(conexao=None):
+    # Copia o conteúdo do WAL para o banco e trunca o WAL
+    (conexao or _conexao()).execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+def _atualizar_esquema(conexao):
+    colunas = {coluna[1] for coluna in conexao.execute('PRAGMA table_info(empresas)')}
+    if 'versao' not in colunas:
+        conexao.execute('ALTER TABLE empresas ADD COLUMN versao INTEGER NOT NULL DEFAULT 0')
+
+def _migrar_json(conexao):
+    migrado = conexao.execute("SELECT valor FROM metadados WHERE chave = 'migracao_json'").fetchone()
+    if migrado or not os.path.exists(arquivo_empresas):
+        return
+
+    with open(arquivo_empresas, 'r') as file:
+        data = json.load(file)
+    with conexao:
+        for nome, info in data.items():
+            _gravar_empresa(conexao, Empresa.from_dict(nome, info))
+        conexao.execute("INSERT INTO metadados (chave, valor) VALUES ('migracao_json', ?)", (arquivo_empresas,))
+
+def _gravar_funcionario(conexao, nome_empresa, funcionario):
+    if funcionario.id is None:
+        ancoras_grupo = [ancora for ancora, in conexao.execute(
+            'SELECT ancora_ciclo FROM funcionarios WHERE empresa = ? AND turno = ? AND funcao = ?',
+            (nome_empresa, funcionario.turno, funcionario.funcao)
+        )]
+        funcionario.ancora_ciclo = escolher_ancora_ciclo(funcionario.ancora_ciclo, ancoras_grupo)
+    valores = (
+        nome_empresa, funcionario.nome, funcionario.funcao, funcionario.familia,
+        funcionario.horario, funcionario.data_inicio, funcionario.turno, funcionario.ancora_ciclo
+    )
+    if funcionario.id is None:
+        cursor = conexao.execute(
+            'INSERT INTO funcionarios (empresa, nome, funcao, familia, horario, data_inicio, turno, ancora_ciclo) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            valores
+        )
+        funcionario.id = cursor.lastrowid
+    else:
+        conexao.execute(
+            'UPDATE funcionarios SET empresa = ?, nome = ?, funcao = ?, familia = ?, horario = ?, '
+            'data_inicio = ?, turno = ?, ancora_ciclo = ? WHERE id = ?',
+            valores + (funcionario.id,)
+        )
+        conexao.execute('DELETE FROM ferias WHERE funcionario_id = ?', (funcionario.id,))
+        conexao.execute('DELETE FROM ajustes_escala WHERE funcionario_id = ?', (funcionario.id,))
+    _gravar_ferias(conexao, funcionario.id, funcionario.ferias)
+    _gravar_ajustes(conexao, funcionario.id, dict(funcionario.ajustes))
+
+def _gravar_ferias(conexao, funcionario_id, periodos):
+    conexao.executemany(
+        'INSERT INTO ferias (funcionario_id, inicio, fim) VALUES (?, ?, ?)',
+        [(funcionario_id, inicio, fim) for inicio, fim in periodos]
+    )
+
+def _gravar_ajustes(conexao, funcionario_id, ajustes):
+    # Só as células alteradas; rótulo vazio desfaz o ajuste e volta ao valor gerado
+    conexao.executemany(
+        'DELETE FROM ajustes_escala WHERE funcionario_id = ? AND data = ?',
+        [(funcionario_id, data) for data, valor in ajustes.items() if not valor]
+    )
+    conexao.executemany(
+        'INSERT INTO ajustes_escala (funcionario_id, data, valor) VALUES (?, ?, ?) '
+        'ON CONFLICT (funcionario_id, data) DO UPDATE SET valor = excluded.valor',
+        [(funcionario_id, data, valor) for data, valor in ajustes.items() if valor]
+    )
+
+def _gravar_celulas_folguistas(conexao, nome_empresa, celulas):
+    # Só reescreve as células cujo valor mudou
+    conexao.executemany(
+        'INSERT INTO escala_folguistas (empresa, linha, ordem, coluna, valor) VALUES (?, ?, ?, ?, ?) '
+        'ON CONFLICT (empresa, linha, coluna) DO UPDATE SET ordem = excluded.ordem, valor = excluded.valor '
+        'WHERE escala_folguistas.valor IS NOT excluded.valor OR escala_folguistas.ordem != excluded.ordem',
+        [(nome_empresa,) + celula for celula in celulas]
+    )
+
+def _gravar_escala_folguistas(conexao, nome_empresa, registros):
+    celulas = [
+        (linha, ordem, coluna, valor)
+        for linha, registro in enumerate(registros or [])
+        for ordem, (coluna, valor) in enumerate(registro.items())
+    ]
+    _gravar_celulas_folguistas(conexao, nome_empresa, celulas)
+    # A grade nova substitui a antiga: some qualquer célula (linha ou coluna) que ela não tenha
+    mantidas = {(linha, coluna) for linha, _, coluna, _ in celulas}
+    conexao.executemany(
+        'DELETE FROM escala_folguistas WHERE empresa = ? AND linha = ? AND coluna = ?',
+        [
+            (nome_empresa, linha, coluna)
+            for linha, coluna in conexao.execute(
+                'SELECT linha, coluna FROM escala_folguistas WHERE empresa = ?', (nome_empresa,)
+            ).fetchall()
+            if (linha, coluna) not in mantidas
+        ]
+    )
+
+def _gravar_efetivo_minimo(conexao, nome_empresa, efetivo_minimo):
+    conexao.execute('DELETE FROM efetivo_minimo WHERE empresa = ?', (nome_empresa,))
+    conexao.executemany(
+        'INSERT INTO efetivo_minimo (empresa, funcao, turno, dia_semana, minimo) VALUES (?, ?, ?, ?, ?)',
+        [
+            (nome_empresa, funcao, turno, dia_semana, int(minimo))
+            for (funcao, turno), minimos in efetivo_minimo.items()
+            for dia_semana, minimo in enumerate(minimos)
+            if minimo
+        ]
+    )
+
+def _gravar_ancoras_ciclo(conexao, nome_empresa, ancoras_por_id):
+    conexao.executemany(
+        'UPDATE funcionarios SET ancora_ciclo = ? WHERE id = ? AND empresa = ?',
+        [(ancora, funcionario_id, nome_empresa) for funcionario_id, ancora in ancoras_por_id.items()]
+    )
+
+# Toda escrita incrementa a versão da empresa, invalidando as cópias em memória
+def _incrementar_versao(conexao, nome_empresa):
+    conexao.execute('UPDATE empresas SET versao = versao + 1 WHERE nome = ?', (nome_empresa,))
+
+def _gravar_empresa(conexao, empresa):
+    conexao.execute('INSERT OR IGNORE INTO empresas (nome) VALUES (?)', (empresa.nome,))
+    _incrementar_versao(conexao, empresa.nome)
+
+    ids = [func.id for funcionarios in empresa.funcionarios.values() for func in funcionarios if func.id is not None]
+    conexao.execute(
+        f"DELETE FROM funcionarios WHERE empresa = ? AND id NOT IN ({','.join('?' * len(ids))})",
+        [empresa.nome] + ids
+    )
+    for funcionarios in empresa.funcionarios.values():
+        for funcionario in funcionarios:
+            _gravar_funcionario(conexao, empresa.nome, funcionario)
+
+    conexao.execute('DELETE FROM folguistas WHERE empresa = ?', (empresa.nome,))
+    conexao.executemany(
+        'INSERT INTO folguistas (empresa, nome) VALUES (?, ?)',
+        [(empresa.nome, nome) for nome in empresa.folguistas]
+    )
+    _gravar_escala_folguistas(conexao, empresa.nome, empresa.folguistas_escala)
+    _gravar_efetivo_minimo(conexao, empresa.nome, empresa.efetivo_minimo)
+
+def _ler_escala_folguistas(conexao, nome_empresa):
+    registros = []
+    for linha, coluna, valor in conexao.execute(
+        'SELECT linha, coluna, valor FROM escala_folguistas WHERE empresa = ? ORDER BY linha, ordem',
+        (nome_empresa,)
+    ):
+        if linha == len(registros):
+            registros.append({})
+        registros[linha][coluna] = valor
+    return registros or None
+
+def _ler_ferias(conexao, filtro='', parametros=()):
+    ferias = {}
+    for funcionario_id, inicio, fim in conexao.execute(
+        'SELECT p.funcionario_id, p.inicio, p.fim FROM ferias p '
+        f'JOIN funcionarios f ON f.id = p.funcionario_id {filtro} ORDER BY p.funcionario_id, p.inicio',
+        parametros
+    ):
+        ferias.setdefault(funcionario_id, []).append((inicio, fim))
+    return ferias
+
+def _ler_efetivo_minimo(conexao, filtro='', parametros=()):
+    efetivo_minimo = {}
+    for empresa, funcao, turno, dia_semana, minimo in conexao.execute(
+        f'SELECT empresa, funcao, turno, dia_semana, minimo FROM efetivo_minimo {filtro}',
+        parametros
+    ):
+        efetivo_minimo.setdefault(empresa, {}).setdefault((funcao, turno), [0] * 7)[dia_semana] = minimo
+    return efetivo_minimo
+
+def _ler_ajustes(conexao, filtro='', parametros=()):
+    ajustes = {}
+    for funcionario_id, data, valor in conexao.execute(
+        'SELECT a.funcionario_id, a.data, a.valor FROM ajustes_escala a '
+        f'JOIN funcionarios f ON f.id = a.funcionario_id {filtro}',
+        parametros
+    ):
+        ajustes.setdefault(funcionario_id, {})[data] = valor
+    return ajustes
+
+def _ler_empresa(conexao, nome_empresa, versao):
+    empresa = Empresa(nome_empresa)
+    empresa.versao = versao
+    ferias = _ler_ferias(conexao, 'WHERE f.empresa = ?', (nome_empresa,))
+    ajustes = _ler_ajustes(conexao, 'WHERE f.empresa = ?', (nome_empresa,))
+    for linha in conexao.execute(
+        'SELECT id, nome, funcao, familia, horario, data_inicio, turno, ancora_ciclo '
+        'FROM funcionarios WHERE empresa = ? ORDER BY id',
+        (nome_empresa,)
+    ):
+        funcionario = Funcionario(*linha[1:], ferias=ferias.get(linha[0]), ajustes=ajustes.get(linha[0]))
+        funcionario.id = linha[0]
+        empresa.adicionar_funcionario(funcionario)
+
+    for (nome,) in conexao.execute('SELECT nome FROM folguistas WHERE empresa = ? ORDER BY id', (nome_empresa,)):
+        empresa.adicionar_folguista(nome)
+
+    empresa.folguistas_escala = _ler_escala_folguistas(conexao, nome_empresa)
+    empresa.efetivo_minimo = _ler_efetivo_minimo(conexao, 'WHERE empresa = ?', (nome_empresa,)).get(nome_empresa, {})
+    return empresa
+
+def listar_empresas():
+    try:
+        return [nome for (nome,) in _conexao().execute('SELECT nome FROM empresas ORDER BY rowid')]
+    except Exception as e:
+        raise _falha("Erro ao listar empresas", e) from e
+
+def versao_empresa(nome_empresa):
+    linha = _conexao().execute('SELECT versao FROM empresas WHERE nome = ?', (nome_empresa,)).fetchone()
+    return linha[0] if linha else None
+
+def existe_empresa(nome_empresa):
+    return versao_empresa(nome_empresa) is not None
+
+def carregar_empresa(nome_empresa):
+    try:
+        conexao = _conexao()
+        with conexao:
+            # Lê versão e dados na mesma transação para que a versão corresponda ao que foi lido
+            conexao.execute('BEGIN')
+            versao = versao_empresa(nome_empresa)
+            if versao is not None:
+                return _ler_empresa(conexao, nome_empresa, versao)
+    except Exception as e:
+        raise _falha("Erro ao carregar empresa", e) from e
+    return None
+
+class RepositorioEmpresas(Mapping):
+    # Lista os nomes direto do banco e só materializa uma empresa quando ela é acessada,
+    # mantendo as mais recentes em um cache LRU. Pode ser compartilhado entre sessões:
+    # cada acesso compara a versão em cache com a do banco e recarrega a empresa se ela mudou.
+    def __init__(self, max_empresas=MAX_EMPRESAS_EM_MEMORIA):
+        self.max_empresas = max_empresas
+        self._cache = OrderedDict()
+        self._trava = threading.Lock()
+
+    def __getitem__(self, nome_empresa):
+        versao = versao_empresa(nome_empresa)
+        with self._trava:
+            empresa = self._cache.get(nome_empresa)
+            if empresa is not None and (versao is None or empresa.versao == versao):
+                self._cache.move_to_end(nome_empresa)
+                return empresa
+
+        empresa = carregar_empresa(nome_empresa)
+        if empresa is None:
+            raise KeyError(nome_empresa)
+        with self._trava:
+            atual = self._cache.get(nome_empresa)
+            recarregada = atual is not None and atual.versao < empresa.versao
+            if atual is None or recarregada:
+                self._cache[nome_empresa] = empresa
+            else:
+                empresa = atual
+            self._cache.move_to_end(nome_empresa)
+            self._limitar()
+        if recarregada:
+            _emitir('empresa_recarregada', nome_empresa)
+        return empresa
+
+    def __setitem__(self, nome_empresa, empresa):
+        with self._trava:
+            self._cache[nome_empresa] = empresa
+            self._cache.move_to_end(nome_empresa)
+            self._limitar()
+
+    def __contains__(self, nome_empresa):
+        with self._trava:
+            if nome_empresa in self._cache:
+                return True
+        return existe_empresa(nome_empresa)
+
+    def __iter__(self):
+        return iter(listar_empresas())
+
+    def __len__(self):
+        return len(listar_empresas())
+
+    def _limitar(self):
+        while len(self._cache) > self.max_empresas:
+            self._cache.popitem(last=False)
 
 def carregar_empresas():
-    if os.path.exists(arquivo_empresas):
-        try:
-            with open(arquivo_empresas, 'r') as file:
-                data = json.load(file)
-                empresas = {}
-                for nome, info in data.items():
-                    empresa = Empresa(nome)
-                    for turno, funcionarios in info['funcionarios'].items():
-                        for func_dict in funcionarios:
-                            funcionario = Funcionario(
-                                func_dict['nome'],
-                                func_dict['funcao'],
-                                func_dict['familia'],
-                                func_dict['horario'],
-                                func_dict['data_inicio'],
-                                func_dict['turno']
-                            )
-                            empresa.adicionar_funcionario(funcionario)
-                    empresa.folguistas = info.get('folguistas', [])
-                    empresa.folguistas_escala = info.get('folguistas_escala', None)
-                    empresas[nome] = empresa
-                return empresas
-        except Exception as e:
-            st.error(f"Erro ao carregar empresas: {str(e)}")
-    return {}
+    try:
+        conexao = _conexao()
+        empresas = {}
+        for nome, versao in conexao.execute('SELECT nome, versao FROM empresas ORDER BY rowid'):
+            empresas[nome] = Empresa(nome)
+            empresas[nome].versao = versao
+
+        ferias = _ler_ferias(conexao)
+        ajustes = _ler_ajustes(conexao)
+        for linha in conexao.execute(
+            'SELECT id, empresa, nome, funcao, familia, horario, data_inicio, turno, ancora_ciclo '
+            'FROM funcionarios ORDER BY id'
+        ):
+            funcionario = Funcionario(*linha[2:], ferias=ferias.get(linha[0]), ajustes=ajustes.get(linha[0]))
+            funcionario.id = linha[0]
+            empresas[linha[1]].adicionar_funcionario(funcionario)
+
+        for empresa, nome in conexao.execute('SELECT empresa, nome FROM folguistas ORDER BY id'):
+            empresas[empresa].adicionar_folguista(nome)
+
+        efetivo_minimo = _ler_efetivo_minimo(conexao)
+        for empresa in empresas.values():
+            empresa.folguistas_escala = _ler_escala_folguistas(conexao, empresa.nome)
+            empresa.efetivo_minimo = efetivo_minimo.get(empresa.nome, {})
+        return empresas
+    except Exception as e:
+        raise _falha("Erro ao carregar empresas", e) from e
 
 def salvar_empresas(empresas):
+    # Sincroniza todas as empresas de uma vez; prefira as funções de inclusão/atualização por linha
+    try:
+        conexao = _conexao()
+        with conexao:
+            conexao.execute(
+                f"DELETE FROM empresas WHERE nome NOT IN ({','.join('?' * len(empresas))})",
+                list(empresas.keys())
+            )
+            for empresa in empresas.values():
+                _gravar_empresa(conexao, empresa)
+        _apos_escrita(conexao)
+    except Exception as e:
+        raise _falha("Erro ao salvar empresas", e) from e
+    _emitir('empresas_salvas', None)
+
+def inserir_empresa(empresa):
     try:
-        data = {}
-        for nome, empresa in empresas.items():
-            empresa_dict = empresa.__dict__.copy()
-            empresa_dict['funcionarios'] = {
-                turno: [func.__dict__ for func in funcionarios]
-                for turno, funcionarios in empresa.funcionarios.items()
-            }
-            data[nome] = empresa_dict
-        with open(arquivo_empresas, 'w') as file:
-            json.dump(data, file, default=lambda o: o.__dict__)
-        st.success("Dados salvos com sucesso!")
-    except Exception as e:
-        st.error(f"Erro ao salvar empresas: {str(e)}")
+        conexao = _conexao()
+        with conexao:
+            # INSERT simples: se outra sessão já cadastrou o nome, nada do que existe é sobrescrito
+            conexao.execute('INSERT INTO empresas (nome) VALUES (?)', (empresa.nome,))
+            _gravar_empresa(conexao, empresa)
+        _apos_escrita(conexao)
+    except sqlite3.IntegrityError as e:
+        raise ErroPersistencia("Essa empresa já está cadastrada") from e
+    except Exception as e:
+        raise _falha("Erro ao salvar empresa", e) from e
+    _emitir('empresa_inserida', empresa.nome)
+
+def inserir_funcionario(nome_empresa, funcionario):
+    try:
+        conexao = _conexao()
+        with conexao:
+            _gravar_funcionario(conexao, nome_empresa, funcionario)
+            _incrementar_versao(conexao, nome_empresa)
+        _apos_escrita(conexao)
+    except Exception as e:
+        raise _falha("Erro ao salvar funcionário", e) from e
+    _emitir('funcionario_inserido', nome_empresa)
+    return funcionario.id
+
+def inserir_ferias(nome_empresa, funcionario, inicio, fim):
+    if fim < inicio:
+        raise ErroPersistencia("Erro ao salvar férias: a data final é anterior à inicial")
+    try:
+        conexao = _conexao()
+        with conexao:
+            _gravar_ferias(conexao, funcionario.id, [(inicio, fim)])
+            _incrementar_versao(conexao, nome_empresa)
+        _apos_escrita(conexao)
+    except Exception as e:
+        raise _falha("Erro ao salvar férias", e) from e
+    _emitir('ferias_inseridas', nome_empresa)
+
+def salvar_ajustes_escala(nome_empresa, ajustes_por_funcionario):
+    # ajustes_por_funcionario: {Funcionario: {data: rótulo}}, só com as células editadas
+    try:
+        conexao = _conexao()
+        with conexao:
+            for funcionario, ajustes in ajustes_por_funcionario.items():
+                _gravar_ajustes(conexao, funcionario.id, ajustes)
+            _incrementar_versao(conexao, nome_empresa)
+        _apos_escrita(conexao)
+    except Exception as e:
+        raise _falha("Erro ao salvar ajustes da escala", e) from e
+    _emitir('ajustes_escala_salvos', nome_empresa)
+
+def inserir_folguista(nome_empresa, nome_folguista, linha_escala, registro_escala):
+    try:
+        conexao = _conexao()
+        with conexao:
+            conexao.execute('INSERT INTO folguistas (empresa, nome) VALUES (?, ?)', (nome_empresa, nome_folguista))
+            _gravar_celulas_folguistas(conexao, nome_empresa, [
+                (linha_escala, ordem, coluna, valor)
+                for ordem, (coluna, valor) in enumerate(registro_escala.items())
+            ])
+            _incrementar_versao(conexao, nome_empresa)
+        _apos_escrita(conexao)
+    except Exception as e:
+        raise _falha("Erro ao salvar folguista", e) from e
+    _emitir('folguista_inserido', nome_empresa)
+
+def atualizar_escala_folguistas(nome_empresa, registros_escala):
+    try:
+        conexao = _conexao()
+        with conexao:
+            _gravar_escala_folguistas(conexao, nome_empresa, registros_escala)
+            _incrementar_versao(conexao, nome_empresa)
+        _apos_escrita(conexao)
+    except Exception as e:
+        raise _falha("Erro ao salvar escala de folguistas", e) from e
+    _emitir('escala_folguistas_atualizada', nome_empresa)
+
+def atualizar_efetivo_minimo(nome_empresa, efetivo_minimo, ancoras_ciclo=None):
+    # efetivo_minimo: {(funcao, turno): [mínimo de segunda, ..., mínimo de domingo]}
+    # ancoras_ciclo: {id do funcionário: âncora}, escolhidas para esse efetivo e gravadas na mesma transação
+    try:
+        conexao = _conexao()
+        with conexao:
+            _gravar_efetivo_minimo(conexao, nome_empresa, efetivo_minimo)
+            _gravar_ancoras_ciclo(conexao, nome_empresa, ancoras_ciclo or {})
+            _incrementar_versao(conexao, nome_empresa)
+        _apos_escrita(conexao)
+    except Exception as e:
+        raise _falha("Erro ao salvar efetivo mínimo", e) from e
+    _emitir('efetivo_minimo_atualizado', nome_empresa)
+
+def atualizar_ancoras_ciclo(nome_empresa, ancoras_ciclo):
+    # ancoras_ciclo: {id do funcionário: âncora}; grava as fases escolhidas para que toda escala as reuse
+    try:
+        conexao = _conexao()
+        with conexao:
+            _gravar_ancoras_ciclo(conexao, nome_empresa, ancoras_ciclo)
+            _incrementar_versao(conexao, nome_empresa)
+        _apos_escrita(conexao)
+    except Exception as e:
+        raise _falha("Erro ao salvar âncoras de ciclo", e) from e
+    _emitir('ancoras_ciclo_atualizadas', nome_empresa)
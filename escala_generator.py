@@ -1,6 +1,85 @@
 from datetime import datetime, timedelta
 import calendar
+import threading
+from collections import OrderedDict
 from functools import lru_cache
+import numpy as np
+from models import interpretar_horario
+
+MAX_DIAS_HORIZONTE = 366
+MAX_LINHAS_EM_CACHE = 20000
+MAX_ESCALAS_EM_CACHE = 64
+# Limite de passadas da busca local que ajusta as fases ao efetivo mínimo
+MAX_PASSADAS_EFETIVO = 20
+# Meses, a partir do mês atual, em que as âncoras são escolhidas para cobrir o efetivo mínimo
+MESES_OTIMIZACAO_EFETIVO = 3
+
+# Códigos da matriz de escala
+TRABALHO = 0
+FOLGA = 1
+FOLGA_DOMINGO = 2
+FERIAS = 3
+
+# Rótulos exibidos para cada código; TRABALHO usa o turno e horário da linha
+ROTULOS = {
+    FOLGA: "Folga",
+    FOLGA_DOMINGO: "Folga (Domingo)",
+    FERIAS: "Férias"
+}
+CODIGOS_POR_ROTULO = {rotulo: codigo for codigo, rotulo in ROTULOS.items()}
+
+class EscalaCodificada:
+    def __init__(self, nomes, funcoes, turnos, horarios, codigos, calendario, jornadas=None):
+        self.nomes = nomes
+        self.funcoes = funcoes
+        self.turnos = turnos
+        self.horarios = horarios
+        # Jornada de cada linha (None quando o horário não pôde ser interpretado)
+        self.jornadas = jornadas if jornadas is not None else [interpretar_horario(horario) for horario in horarios]
+        self.codigos = codigos
+        self.calendario = calendario
+        # Pessoas que ainda faltam por dia para o efetivo mínimo de cada função, quando não há solução
+        self.faltas = {}
+        # Id do funcionário de cada linha e as células de trabalho editadas com outro rótulo: {(linha, dia): rótulo}
+        self.ids = [None] * len(nomes)
+        self.ajustes = {}
+        # Código que o gerador deu a cada célula com ajuste salvo, antes do ajuste: {(linha, dia): código}
+        self.codigos_gerados = {}
+
+    @property
+    def num_dias(self):
+        return self.codigos.shape[1]
+
+class Calendario:
+    def __init__(self, data_inicio, num_dias):
+        inicio = np.datetime64(data_inicio, 'D')
+        self.datas = inicio + np.arange(num_dias)
+        # 1970-01-01 foi uma quinta-feira (weekday 3)
+        self.dias_semana = (self.datas.astype(np.int64) + 3) % 7
+
+        meses = self.datas.astype('datetime64[M]')
+        self.indice_mes = (meses - meses[0]).astype(np.int64)
+        self.inicios_meses = np.flatnonzero(np.r_[True, self.indice_mes[1:] != self.indice_mes[:-1]])
+
+        # Ordem de cada domingo dentro do seu mês (-1 nos outros dias) e total de domingos do mês, contados
+        # sobre o mês civil inteiro, para que o domingo de folga não dependa de onde o horizonte começa
+        primeiros_dias = meses.astype('datetime64[D]')
+        dias_do_mes = ((meses + np.timedelta64(1, 'M')).astype('datetime64[D]') - primeiros_dias).astype(np.int64)
+        dia_do_mes = (self.datas - primeiros_dias).astype(np.int64)
+        primeiro_domingo = (6 - (primeiros_dias.astype(np.int64) + 3) % 7) % 7
+        self.ordem_domingo = np.where(self.dias_semana == 6, dia_do_mes // 7, -1)
+        self.domingos_no_mes = (dias_do_mes - 1 - primeiro_domingo) // 7 + 1
+
+        # Verdadeiro quando o calendário cobre exatamente um mês a partir do dia 1
+        primeiro_dia = self.datas[0].astype(object)
+        self.mes_completo = primeiro_dia.day == 1 and num_dias == calendar.monthrange(primeiro_dia.year, primeiro_dia.month)[1]
+
+        for vetor in (self.datas, self.dias_semana, self.indice_mes, self.inicios_meses, self.ordem_domingo, self.domingos_no_mes):
+            vetor.flags.writeable = False
+
+    @property
+    def num_dias(self):
+        return len(self.datas)
 
 @lru_cache(maxsize=None)
 def obter_domingos(data_inicio):
@@ -51,4 +130,514 @@ def gerar_escala_turnos_por_funcao(funcionarios_por_funcao, data_inicio, ferias,
 
         escala_final[funcao] = escala
 
-    return escala_final
\ No newline at end of file
+    return escala_final
+
+
+def obter_colunas_dias(calendario):
+    # Escalas de um mês mantêm as colunas 'Dia N'; horizontes maiores usam a data completa
+    if calendario.mes_completo:
+        return [f'Dia {i+1}' for i in range(calendario.num_dias)]
+    return [str(data) for data in calendario.datas]
+
+def escala_para_linhas(escala):
+    # Linhas com o nome e o rótulo de cada dia, sem depender do pandas
+    linhas = zip(escala.nomes, escala.turnos, escala.horarios, escala.codigos.tolist())
+    for linha, (nome, turno, horario, codigos) in enumerate(linhas):
+        rotulos = (f"{turno}: {horario}", ROTULOS[FOLGA], ROTULOS[FOLGA_DOMINGO], ROTULOS[FERIAS])
+        celulas = [rotulos[codigo] for codigo in codigos]
+        if escala.ajustes:
+            for dia in range(len(celulas)):
+                celulas[dia] = escala.ajustes.get((linha, dia), celulas[dia])
+        yield [nome] + celulas
+
+@lru_cache(maxsize=64)
+def recortar_escala(escala, linhas, dia_inicio, dia_fim):
+    # Só as linhas (tupla de índices) e os dias [dia_inicio, dia_fim) visíveis; o recorte é uma escala
+    # completa, com o próprio calendário, então DataFrame, validação e ajustes funcionam sobre ele
+    if linhas == tuple(range(len(escala.nomes))) and (dia_inicio, dia_fim) == (0, escala.num_dias):
+        return escala
+    indices = list(linhas)
+    calendario = obter_calendario(str(escala.calendario.datas[dia_inicio]), dia_fim - dia_inicio)
+    recorte = EscalaCodificada(
+        [escala.nomes[i] for i in indices],
+        [escala.funcoes[i] for i in indices],
+        [escala.turnos[i] for i in indices],
+        [escala.horarios[i] for i in indices],
+        escala.codigos[indices, dia_inicio:dia_fim],
+        calendario,
+        [escala.jornadas[i] for i in indices]
+    )
+    recorte.codigos.flags.writeable = False
+    recorte.ids = [escala.ids[i] for i in indices]
+    recorte.faltas = {funcao: falta[dia_inicio:dia_fim] for funcao, falta in escala.faltas.items()}
+    posicoes = {linha: posicao for posicao, linha in enumerate(indices)}
+    recorte.ajustes = {
+        (posicoes[linha], dia - dia_inicio): rotulo
+        for (linha, dia), rotulo in escala.ajustes.items()
+        if linha in posicoes and dia_inicio <= dia < dia_fim
+    }
+    recorte.codigos_gerados = {
+        (posicoes[linha], dia - dia_inicio): codigo
+        for (linha, dia), codigo in escala.codigos_gerados.items()
+        if linha in posicoes and dia_inicio <= dia < dia_fim
+    }
+    return recorte
+
+def rotulo_gerado(escala, linha, dia):
+    # Rótulo que o gerador deu à célula, sem o ajuste salvo que possa haver nela
+    codigo = escala.codigos_gerados.get((linha, dia), escala.codigos[linha, dia])
+    if codigo == TRABALHO:
+        return f"{escala.turnos[linha]}: {escala.horarios[linha]}"
+    return ROTULOS[codigo]
+
+@lru_cache(maxsize=32)
+def obter_calendario(data_inicio, num_dias):
+    return Calendario(data_inicio, num_dias)
+
+def calcular_num_dias_horizonte(data_inicio, num_dias=None, meses=None):
+    if (num_dias is None) == (meses is None):
+        raise ValueError("Informe num_dias ou meses para o horizonte da escala")
+
+    if meses is not None:
+        inicio = datetime.strptime(data_inicio, '%Y-%m-%d')
+        ano, mes = divmod(inicio.month - 1 + meses, 12)
+        ano += inicio.year
+        dia = min(inicio.day, calendar.monthrange(ano, mes + 1)[1])
+        num_dias = (datetime(ano, mes + 1, dia) - inicio).days
+
+    if not 0 < num_dias <= MAX_DIAS_HORIZONTE:
+        raise ValueError(f"O horizonte da escala deve ter entre 1 e {MAX_DIAS_HORIZONTE} dias")
+    return num_dias
+
+def obter_calendario_mes(data_inicio, meses=1):
+    inicio_mes = datetime.strptime(data_inicio, '%Y-%m-%d').replace(day=1).strftime('%Y-%m-%d')
+    return obter_calendario(inicio_mes, calcular_num_dias_horizonte(inicio_mes, meses=meses))
+
+def calcular_linhas_escala(deslocamentos, posicoes_domingo, calendario, dias_trabalho=5, dias_folga=1):
+    ciclo = dias_trabalho + dias_folga
+    dias = np.arange(calendario.num_dias)
+
+    # Ciclo 5x1 de todas as linhas de uma vez: cada linha começa deslocada pela sua fase
+    # e a fase continua de um mês para o outro
+    em_trabalho = (dias[np.newaxis, :] + deslocamentos[:, np.newaxis]) % ciclo < dias_trabalho
+    matriz = np.where(em_trabalho, TRABALHO, FOLGA).astype(np.uint8)
+
+    # Domingos são dias de trabalho, exceto um domingo de folga por mês para cada linha
+    domingos = np.flatnonzero(calendario.ordem_domingo >= 0)
+    folga_domingo = posicoes_domingo[:, np.newaxis] % calendario.domingos_no_mes[domingos] == calendario.ordem_domingo[domingos]
+    matriz[:, domingos] = np.where(folga_domingo, FOLGA_DOMINGO, TRABALHO)
+
+    return matriz
+
+def calcular_matriz_escala(num_funcionarios, calendario, dias_trabalho=5, dias_folga=1):
+    # Fase pela posição: o funcionário i começa deslocado i dias
+    indices = np.arange(num_funcionarios)
+    return calcular_linhas_escala(indices, indices, calendario, dias_trabalho, dias_folga)
+
+_cache_linhas = OrderedDict()
+_trava_cache_linhas = threading.Lock()
+
+def calcular_linhas_ancoradas(ancoras, calendario, dias_trabalho=5, dias_folga=1):
+    # A fase e o domingo de folga dependem só da âncora de cada funcionário, então
+    # incluir, remover ou editar alguém só calcula as linhas que ainda não estão em cache
+    chave_calendario = (calendario.datas[0].item(), calendario.num_dias, dias_trabalho, dias_folga)
+    linhas = {}
+    with _trava_cache_linhas:
+        for ancora in ancoras:
+            chave = (chave_calendario, ancora)
+            if ancora not in linhas and chave in _cache_linhas:
+                _cache_linhas.move_to_end(chave)
+                linhas[ancora] = _cache_linhas[chave]
+
+    faltantes = [ancora for ancora in dict.fromkeys(ancoras) if ancora not in linhas]
+    if faltantes:
+        dias_ancora = np.array(faltantes, dtype='datetime64[D]').astype(np.int64)
+        deslocamentos = calendario.datas[0].astype(np.int64) - dias_ancora
+        novas = calcular_linhas_escala(deslocamentos, dias_ancora, calendario, dias_trabalho, dias_folga)
+        novas.flags.writeable = False
+        with _trava_cache_linhas:
+            for ancora, linha in zip(faltantes, novas):
+                linhas[ancora] = linha
+                _cache_linhas[(chave_calendario, ancora)] = linha
+            while len(_cache_linhas) > MAX_LINHAS_EM_CACHE:
+                _cache_linhas.popitem(last=False)
+
+    if not ancoras:
+        return np.empty((0, calendario.num_dias), dtype=np.uint8)
+    return np.stack([linhas[ancora] for ancora in ancoras])
+
+def calcular_linhas_grupo(funcionarios, calendario, dias_trabalho=5, dias_folga=1):
+    dados = list(funcionarios.values())
+    if dados and all(dado.get('ancora_ciclo') for dado in dados):
+        ancoras = [dado['ancora_ciclo'] for dado in dados]
+        return calcular_linhas_ancoradas(ancoras, calendario, dias_trabalho, dias_folga)
+    return calcular_matriz_escala(len(dados), calendario, dias_trabalho, dias_folga)
+
+def exigencia_por_dia(minimos_semana, calendario):
+    # Mínimos de segunda (0) a domingo (6) expandidos para cada dia do calendário
+    return np.asarray(minimos_semana, dtype=np.int64)[calendario.dias_semana]
+
+def _falta_total(exigido, cobertura):
+    return np.maximum(exigido - cobertura, 0).sum(axis=-1)
+
+def _reparar_fases(candidatos, exigido, escolha, cobertura):
+    # Busca local: move um funcionário por vez, só quando a falta diminui, até não melhorar mais
+    for _ in range(MAX_PASSADAS_EFETIVO):
+        melhorou = False
+        for i in range(len(escolha)):
+            sem_i = cobertura - candidatos[i, escolha[i]]
+            faltas = _falta_total(exigido, sem_i + candidatos[i])
+            melhor = np.argmin(faltas)
+            if faltas[melhor] < faltas[escolha[i]]:
+                escolha[i] = melhor
+                cobertura = sem_i + candidatos[i, melhor]
+                melhorou = True
+        if not melhorou or _falta_total(exigido, cobertura) == 0:
+            break
+    return escolha, cobertura
+
+def ajustar_fases_efetivo(deslocamentos, posicoes_domingo, exigido, calendario, bloqueado=None, dias_trabalho=5, dias_folga=1):
+    # Escolhe para cada funcionário um avanço k da âncora (que muda a fase do ciclo e o domingo de folga)
+    # de modo a cobrir o efetivo exigido por dia. Retorna as novas fases e quantos faltam por dia.
+    num_funcionarios, num_dias = len(deslocamentos), calendario.num_dias
+    # Os domingos de folga giram com 4 ou 5 domingos por mês, então 20 dias de avanço esgotam as combinações
+    avancos = np.arange(np.lcm(dias_trabalho + dias_folga, 20))
+    candidatos = calcular_linhas_escala(
+        (deslocamentos[:, np.newaxis] - avancos).ravel(),
+        (posicoes_domingo[:, np.newaxis] + avancos).ravel(),
+        calendario, dias_trabalho, dias_folga
+    ).reshape(num_funcionarios, len(avancos), num_dias) == TRABALHO
+    if bloqueado is not None:
+        candidatos &= ~bloqueado[:, np.newaxis, :]
+    candidatos = candidatos.astype(np.int64)
+
+    escolha = np.zeros(num_funcionarios, dtype=np.int64)
+    cobertura = candidatos[:, 0].sum(axis=0)
+    if _falta_total(exigido, cobertura) > 0:
+        # Primeiro a partir das fases atuais (argmin fica com o menor avanço em caso de empate), para
+        # que só mude quem precisa; quem já está escalado assim não tem a linha trocada à toa
+        escolha, cobertura = _reparar_fases(candidatos, exigido, escolha, cobertura)
+        if _falta_total(exigido, cobertura) > 0:
+            # Sem cobertura completa, tenta também a construção gulosa do zero e fica com a de menor falta
+            gulosa = np.zeros(num_funcionarios, dtype=np.int64)
+            cobertura_gulosa = np.zeros(num_dias, dtype=np.int64)
+            for i in range(num_funcionarios):
+                gulosa[i] = np.argmin(_falta_total(exigido, cobertura_gulosa + candidatos[i]))
+                cobertura_gulosa += candidatos[i, gulosa[i]]
+            gulosa, cobertura_gulosa = _reparar_fases(candidatos, exigido, gulosa, cobertura_gulosa)
+            if _falta_total(exigido, cobertura_gulosa) < _falta_total(exigido, cobertura):
+                escolha, cobertura = gulosa, cobertura_gulosa
+
+    return deslocamentos - escolha, posicoes_domingo + escolha, np.maximum(exigido - cobertura, 0)
+
+def otimizar_ancoras_efetivo(empresa, efetivo_minimo=None, data_inicio=None, meses=MESES_OTIMIZACAO_EFETIVO, dias_trabalho=5, dias_folga=1):
+    # Avança as âncoras de ciclo para cobrir o efetivo mínimo e retorna {id do funcionário: nova âncora}
+    # só de quem muda. O resultado é gravado junto com o efetivo ou o quadro, então toda escala gerada
+    # depois parte das mesmas âncoras, em qualquer período, e o ciclo continua de um mês para o outro.
+    efetivo_minimo = empresa.efetivo_minimo if efetivo_minimo is None else efetivo_minimo
+    data_inicio = data_inicio or datetime.today().strftime('%Y-%m-01')
+    calendario = obter_calendario_mes(data_inicio, meses)
+    novas_ancoras = {}
+    for turno, funcionarios_turno in empresa.funcionarios.items():
+        minimos = minimos_do_turno(efetivo_minimo, turno)
+        grupos = {}
+        for funcionario in funcionarios_turno:
+            grupos.setdefault(funcionario.funcao, []).append(funcionario)
+        for funcao, funcionarios in grupos.items():
+            exigido = exigencia_por_dia(minimos.get(funcao, (0,) * 7), calendario)
+            if not exigido.any() or not all(funcionario.ancora_ciclo for funcionario in funcionarios):
+                continue
+            dias_ancora = np.array([funcionario.ancora_ciclo for funcionario in funcionarios], dtype='datetime64[D]')
+            em_ferias = IndiceFerias.de_periodos([funcionario.ferias for funcionario in funcionarios]).mascara(len(funcionarios), calendario)
+            _, ancoras, _ = ajustar_fases_efetivo(
+                (calendario.datas[0] - dias_ancora).astype(np.int64), dias_ancora.astype(np.int64),
+                exigido, calendario, em_ferias, dias_trabalho, dias_folga
+            )
+            for funcionario, anterior, nova in zip(funcionarios, dias_ancora.astype(np.int64).tolist(), ancoras.tolist()):
+                if nova != anterior:
+                    novas_ancoras[funcionario.id] = str(np.datetime64(nova, 'D'))
+    return novas_ancoras
+
+def gerar_escala_turnos_por_funcao_vetorizada(funcionarios_por_funcao, data_inicio, ferias, dias_trabalho=5, dias_folga=1):
+    escala_final = {}
+    calendario = obter_calendario_mes(data_inicio)
+
+    for funcao, funcionarios in funcionarios_por_funcao.items():
+        nomes = list(funcionarios.keys())
+        matriz = calcular_linhas_grupo(funcionarios, calendario, dias_trabalho, dias_folga)
+
+        escala = {}
+        for nome, codigos in zip(nomes, matriz.tolist()):
+            if nome in ferias:
+                continue
+            trabalho = f"{funcionarios[nome]['turno']}: {funcionarios[nome]['horario']}"
+            rotulos = (trabalho, ROTULOS[FOLGA], ROTULOS[FOLGA_DOMINGO])
+            escala[nome] = [rotulos[codigo] for codigo in codigos]
+
+        escala_final[funcao] = escala
+
+    return escala_final
+
+class IndiceFerias:
+    # Períodos de férias (inclusivos), com a linha da escala de cada um
+    def __init__(self, linhas, inicios, fins):
+        self.linhas = np.asarray(linhas, dtype=np.int64)
+        self.inicios = np.asarray(inicios, dtype='datetime64[D]')
+        self.fins = np.asarray(fins, dtype='datetime64[D]')
+
+    @classmethod
+    def de_periodos(cls, periodos_por_linha):
+        linhas, inicios, fins = [], [], []
+        for linha, periodos in enumerate(periodos_por_linha):
+            for inicio, fim in periodos or ():
+                linhas.append(linha)
+                inicios.append(inicio)
+                fins.append(fim)
+        return cls(linhas, inicios, fins)
+
+    def __len__(self):
+        return len(self.linhas)
+
+    def mascara(self, num_linhas, calendario):
+        # Soma de diferenças: +1 no início e -1 após o fim de cada período, acumulada por linha
+        inicio_calendario = calendario.datas[0]
+        inicios = np.clip((self.inicios - inicio_calendario).astype(np.int64), 0, calendario.num_dias)
+        fins = np.clip((self.fins - inicio_calendario).astype(np.int64) + 1, 0, calendario.num_dias)
+        validos = inicios < fins
+
+        diferencas = np.zeros((num_linhas, calendario.num_dias + 1), dtype=np.int32)
+        np.add.at(diferencas, (self.linhas[validos], inicios[validos]), 1)
+        np.add.at(diferencas, (self.linhas[validos], fins[validos]), -1)
+        return np.cumsum(diferencas[:, :-1], axis=1) > 0
+
+def normalizar_ferias(ferias):
+    # Nomes separados por vírgula (texto) ou qualquer coleção de nomes, comparados por igualdade
+    if isinstance(ferias, str):
+        ferias = ferias.split(',')
+    return frozenset(nome.strip() for nome in ferias or () if nome and nome.strip())
+
+def _nome_em_ferias(nome, ferias):
+    return nome in ferias or nome.rsplit(' (', 1)[0] in ferias
+
+def montar_escala_codificada(funcionarios_por_funcao, calendario, ferias, dias_trabalho=5, dias_folga=1, minimos=None):
+    # minimos: {funcao: [mínimo de segunda, ..., mínimo de domingo]} para o turno desta escala
+    ferias = normalizar_ferias(ferias)
+    minimos = minimos or {}
+    nomes, funcoes, turnos, horarios, jornadas, periodos, ids, ajustes, grupos = [], [], [], [], [], [], [], [], []
+
+    for funcao, funcionarios in funcionarios_por_funcao.items():
+        grupos.append((funcao, funcionarios, len(nomes)))
+        for nome, dados in funcionarios.items():
+            jornada = dados.get('jornada') or interpretar_horario(dados['horario'])
+            nomes.append(nome)
+            funcoes.append(funcao)
+            turnos.append(dados['turno'])
+            horarios.append(jornada.rotulo if jornada else dados['horario'])
+            jornadas.append(jornada)
+            periodos.append(dados.get('ferias'))
+            ids.append(dados.get('id'))
+            ajustes.append(dados.get('ajustes'))
+
+    # Períodos cadastrados marcam só os dias afetados; nomes informados em ferias cobrem o horizonte todo
+    indice_ferias = IndiceFerias.de_periodos(periodos)
+    if len(indice_ferias):
+        em_ferias = indice_ferias.mascara(len(nomes), calendario)
+    else:
+        em_ferias = np.zeros((len(nomes), calendario.num_dias), dtype=bool)
+    if ferias:
+        em_ferias[[i for i, nome in enumerate(nomes) if _nome_em_ferias(nome, ferias)]] = True
+
+    # As linhas saem só das âncoras gravadas (ajustadas ao efetivo por otimizar_ancoras_efetivo), então
+    # a escala de um dia não depende do período pedido; aqui só se mede quanto falta do mínimo
+    faltas, matrizes = {}, []
+    for funcao, funcionarios, inicio in grupos:
+        matriz = calcular_linhas_grupo(funcionarios, calendario, dias_trabalho, dias_folga)
+        matrizes.append(matriz)
+        exigido = exigencia_por_dia(minimos.get(funcao, (0,) * 7), calendario)
+        if exigido.any():
+            trabalhando = (matriz == TRABALHO) & ~em_ferias[inicio:inicio + len(funcionarios)]
+            falta = np.maximum(exigido - trabalhando.sum(axis=0), 0)
+            if falta.any():
+                faltas[funcao] = falta
+
+    # Funções com mínimo exigido mas sem ninguém cadastrado no turno
+    for funcao, minimos_semana in minimos.items():
+        if funcao not in funcionarios_por_funcao:
+            exigido = exigencia_por_dia(minimos_semana, calendario)
+            if exigido.any():
+                faltas[funcao] = exigido
+
+    if matrizes:
+        codigos = np.concatenate(matrizes)
+    else:
+        codigos = np.empty((0, calendario.num_dias), dtype=np.uint8)
+    codigos[em_ferias] = FERIAS
+
+    escala = EscalaCodificada(nomes, funcoes, turnos, horarios, codigos, calendario, jornadas)
+    escala.faltas = faltas
+    escala.ids = ids
+    aplicar_ajustes(escala, ajustes)
+    return escala
+
+def aplicar_ajustes(escala, ajustes_por_linha):
+    # Sobrepõe as células editadas (pares (data, rótulo) de cada linha) à escala gerada; só as datas
+    # dentro do calendário contam, então um ajuste vale para qualquer período que inclua a data
+    inicio = escala.calendario.datas[0]
+    for linha, ajustes in enumerate(ajustes_por_linha):
+        for data, rotulo in ajustes or ():
+            dia = int((np.datetime64(data, 'D') - inicio).astype(np.int64))
+            if not 0 <= dia < escala.num_dias:
+                continue
+            codigo = CODIGOS_POR_ROTULO.get(rotulo, TRABALHO)
+            escala.codigos_gerados.setdefault((linha, dia), int(escala.codigos[linha, dia]))
+            escala.codigos[linha, dia] = codigo
+            if codigo == TRABALHO and rotulo != f"{escala.turnos[linha]}: {escala.horarios[linha]}":
+                escala.ajustes[(linha, dia)] = rotulo
+            else:
+                escala.ajustes.pop((linha, dia), None)
+
+def gerar_escala_codificada(funcionarios_por_funcao, data_inicio, ferias, dias_trabalho=5, dias_folga=1, meses=1, minimos=None):
+    calendario = obter_calendario_mes(data_inicio, meses)
+    return montar_escala_codificada(funcionarios_por_funcao, calendario, ferias, dias_trabalho, dias_folga, minimos)
+
+def gerar_escala_horizonte(funcionarios_por_funcao, data_inicio, ferias, num_dias=None, meses=None, dias_trabalho=5, dias_folga=1, minimos=None):
+    calendario = obter_calendario(data_inicio, calcular_num_dias_horizonte(data_inicio, num_dias, meses))
+    return montar_escala_codificada(funcionarios_por_funcao, calendario, ferias, dias_trabalho, dias_folga, minimos)
+
+def agrupar_funcionarios_por_funcao(funcionarios_turno):
+    funcionarios_por_funcao = {}
+    for func in funcionarios_turno:
+        funcao = func.funcao
+        nome = f"{func.nome} ({func.familia})"
+        if funcao not in funcionarios_por_funcao:
+            funcionarios_por_funcao[funcao] = {}
+        funcionarios_por_funcao[funcao][nome] = {
+            'horario': func.horario,
+            'jornada': func.jornada,
+            'data_inicio': func.data_inicio,
+            'ancora_ciclo': func.ancora_ciclo,
+            'turno': func.turno,
+            'ferias': func.ferias,
+            'ajustes': func.ajustes,
+            'id': func.id
+        }
+    return funcionarios_por_funcao
+
+def minimos_do_turno(efetivo_minimo, turno):
+    return {funcao: minimos for (funcao, turno_minimo), minimos in efetivo_minimo.items() if turno_minimo == turno}
+
+_cache_escalas = OrderedDict()
+_trava_cache_escalas = threading.Lock()
+
+def gerar_escala_turno(empresa, turno, data_inicio, ferias, dias_trabalho=5, dias_folga=1, meses=1):
+    # A versão da empresa muda a cada alteração gravada, então a mesma chave implica o mesmo quadro
+    chave = (empresa.nome, empresa.versao, turno, data_inicio, normalizar_ferias(ferias), dias_trabalho, dias_folga, meses)
+    with _trava_cache_escalas:
+        if chave in _cache_escalas:
+            _cache_escalas.move_to_end(chave)
+            return _cache_escalas[chave]
+
+    funcionarios_por_funcao = agrupar_funcionarios_por_funcao(empresa.funcionarios[turno])
+    escala = gerar_escala_codificada(
+        funcionarios_por_funcao, data_inicio, ferias, dias_trabalho, dias_folga, meses,
+        minimos_do_turno(empresa.efetivo_minimo, turno)
+    )
+    escala.codigos.flags.writeable = False
+
+    with _trava_cache_escalas:
+        _cache_escalas[chave] = escala
+        while len(_cache_escalas) > MAX_ESCALAS_EM_CACHE:
+            _cache_escalas.popitem(last=False)
+    return escala
+
+def invalidar_escalas(nome_empresa=None):
+    with _trava_cache_escalas:
+        for chave in [chave for chave in _cache_escalas if nome_empresa is None or chave[0] == nome_empresa]:
+            del _cache_escalas[chave]
+    # Os recortes guardam referência à escala de origem; sem limpá-los ela continuaria em memória
+    recortar_escala.cache_clear()
+
+class IndiceCobertura:
+    # Quem trabalha e quem está ausente (folga ou férias) por dia, turno e função, a partir das matrizes
+    def __init__(self, escalas):
+        self.calendario = escalas[0].calendario if escalas else None
+        self.nomes = [nome for escala in escalas for nome in escala.nomes]
+        self.turnos = [turno for escala in escalas for turno in escala.turnos]
+        self.funcoes = [funcao for escala in escalas for funcao in escala.funcoes]
+        self.horarios = [horario for escala in escalas for horario in escala.horarios]
+        num_dias = self.calendario.num_dias if escalas else 0
+
+        self.grupos = {}
+        grupo_linha = np.array(
+            [self.grupos.setdefault(chave, len(self.grupos)) for chave in zip(self.turnos, self.funcoes)],
+            dtype=np.int64
+        )
+        num_grupos = len(self.grupos)
+        if escalas:
+            codigos = np.concatenate([escala.codigos for escala in escalas])
+        else:
+            codigos = np.empty((0, 0), dtype=np.uint8)
+
+        # Linhas ordenadas por grupo; cada (dia, grupo) vira uma fatia contígua de um vetor só
+        self._ordem = np.argsort(grupo_linha, kind='stable')
+        grupo_ordenado = grupo_linha[self._ordem]
+        ausente = (codigos[self._ordem] != TRABALHO).T
+        self._trabalhando = self._fatias(~ausente, grupo_ordenado, num_dias, num_grupos)
+        self._ausentes = self._fatias(ausente, grupo_ordenado, num_dias, num_grupos)
+
+        contagem_ausentes = np.diff(self._ausentes[1]).reshape(num_dias, num_grupos)
+        tamanho_grupos = np.bincount(grupo_linha, minlength=num_grupos)
+        self.contagem_ausentes = contagem_ausentes
+        self.contagem_trabalhando = tamanho_grupos - contagem_ausentes
+
+    @staticmethod
+    def _fatias(mascara, grupo_ordenado, num_dias, num_grupos):
+        dias, posicoes = np.nonzero(mascara)
+        chaves = dias * num_grupos + grupo_ordenado[posicoes]
+        ponteiros = np.searchsorted(chaves, np.arange(num_dias * num_grupos + 1))
+        return posicoes, ponteiros
+
+    def indice_dia(self, dia):
+        # Aceita a posição do dia no calendário ou uma data; fora do horizonte é erro, não resultado vazio
+        if self.calendario is None:
+            raise ValueError("Índice de cobertura sem escalas")
+        if isinstance(dia, (int, np.integer)):
+            indice = int(dia)
+        else:
+            indice = int((np.datetime64(dia, 'D') - self.calendario.datas[0]).astype(np.int64))
+        if not 0 <= indice < self.calendario.num_dias:
+            raise ValueError(f"Dia {dia} fora do horizonte de {self.calendario.datas[0]} a {self.calendario.datas[-1]}")
+        return indice
+
+    def _consultar(self, fatias, dia, turno, funcao):
+        posicoes, ponteiros = fatias
+        base = self.indice_dia(dia) * len(self.grupos)
+        if turno is not None and funcao is not None:
+            grupo = self.grupos.get((turno, funcao))
+            if grupo is None:
+                return np.empty(0, dtype=np.int64)
+            return self._ordem[posicoes[ponteiros[base + grupo]:ponteiros[base + grupo + 1]]]
+        if turno is None and funcao is None:
+            return self._ordem[posicoes[ponteiros[base]:ponteiros[base + len(self.grupos)]]]
+        grupos = [
+            grupo for (turno_grupo, funcao_grupo), grupo in self.grupos.items()
+            if turno in (None, turno_grupo) and funcao in (None, funcao_grupo)
+        ]
+        return np.concatenate(
+            [self._ordem[posicoes[ponteiros[base + grupo]:ponteiros[base + grupo + 1]]] for grupo in grupos]
+            or [np.empty(0, dtype=np.int64)]
+        )
+
+    def trabalhando(self, dia, turno=None, funcao=None):
+        return self._consultar(self._trabalhando, dia, turno, funcao)
+
+    def ausentes(self, dia, turno=None, funcao=None):
+        return self._consultar(self._ausentes, dia, turno, funcao)
+
+    def contagem(self, dia, turno, funcao):
+        # Retorna (trabalhando, ausentes) do grupo no dia
+        dia = self.indice_dia(dia)
+        grupo = self.grupos.get((turno, funcao))
+        if grupo is None:
+            return 0, 0
+        return int(self.contagem_trabalhando[dia, grupo]), int(self.contagem_ausentes[dia, grupo])
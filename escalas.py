@@ -0,0 +1,115 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+# Interface de linha de comando para gerar e exportar escalas sem iniciar o Streamlit:
+#   python -m escalas generate --empresa "Posto X" --mes 2026-11 --out escala.csv
+#   python -m escalas batch --mes 2026-11 --saida data/escalas
+
+def _mes(valor):
+    # Usado como type= do argparse: devolve o primeiro dia do mês ou um erro de uso legível
+    try:
+        return datetime.strptime(valor, '%Y-%m').strftime('%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"mês inválido: {valor!r} (use AAAA-MM)")
+
+def _inteiro_entre(minimo, maximo):
+    def converter(valor):
+        try:
+            numero = int(valor)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"número inválido: {valor!r}")
+        if not minimo <= numero <= maximo:
+            raise argparse.ArgumentTypeError(f"{numero} fora do intervalo de {minimo} a {maximo}")
+        return numero
+    return converter
+
+def comando_listar(args):
+    from data_manager import listar_empresas
+
+    for nome in listar_empresas():
+        print(nome)
+    return 0
+
+def comando_gerar(args):
+    from data_manager import carregar_empresa
+    from escala_generator import agrupar_funcionarios_por_funcao, gerar_escala_codificada, minimos_do_turno
+    from lote_escalas import escrever_escala_csv
+
+    empresa = carregar_empresa(args.empresa)
+    if empresa is None:
+        print(f"Empresa {args.empresa} não encontrada", file=sys.stderr)
+        return 1
+
+    escalas = [
+        gerar_escala_codificada(
+            agrupar_funcionarios_por_funcao(funcionarios_turno), args.mes, args.ferias,
+            args.dias_trabalho, args.dias_folga, args.meses, minimos_do_turno(empresa.efetivo_minimo, turno)
+        )
+        for turno, funcionarios_turno in empresa.funcionarios.items()
+        if funcionarios_turno
+    ]
+    if not escalas:
+        print(f"Empresa {args.empresa} não tem funcionários cadastrados", file=sys.stderr)
+        return 1
+
+    # '-' escreve na saída padrão, em qualquer sistema
+    escrever_escala_csv(escalas, sys.stdout if args.out == '-' else args.out)
+    return 0
+
+def comando_lote(args):
+    from data_manager import carregar_empresas
+    from lote_escalas import gerar_escalas_em_lote
+
+    inicio = time.perf_counter()
+    resultados = gerar_escalas_em_lote(
+        carregar_empresas(), args.mes, args.saida, args.ferias,
+        args.dias_trabalho, args.dias_folga, args.meses, args.processos
+    )
+    for nome_empresa, relatorio in sorted(resultados.items()):
+        print(f"{nome_empresa}: {relatorio['funcionarios']} funcionários em {relatorio['segundos']:.3f}s")
+    print(f"{len(resultados)} empresas em {time.perf_counter() - inicio:.2f}s")
+    return 0
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog='escalas', description='Gerador de escalas de trabalho')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    listar = subparsers.add_parser('list', aliases=['listar'], help='Lista as empresas cadastradas')
+    listar.set_defaults(funcao=comando_listar)
+
+    parametros = argparse.ArgumentParser(add_help=False)
+    parametros.add_argument('--mes', type=_mes, default=datetime.today().strftime('%Y-%m'), help='Mês inicial (AAAA-MM)')
+    parametros.add_argument('--meses', type=_inteiro_entre(1, 12), default=1, help='Número de meses do horizonte (1 a 12)')
+    parametros.add_argument('--ferias', default='', help='Nome do funcionário de férias')
+    parametros.add_argument('--dias-trabalho', type=_inteiro_entre(1, 31), default=5)
+    parametros.add_argument('--dias-folga', type=_inteiro_entre(1, 31), default=1)
+
+    gerar = subparsers.add_parser('generate', aliases=['gerar'], parents=[parametros], help='Gera a escala de uma empresa')
+    gerar.add_argument('--empresa', required=True)
+    gerar.add_argument('--out', default='-', help="Arquivo CSV de saída ('-' para a saída padrão)")
+    gerar.set_defaults(funcao=comando_gerar)
+
+    lote = subparsers.add_parser('batch', aliases=['lote'], parents=[parametros], help='Gera as escalas de todas as empresas')
+    lote.add_argument('--saida', default=os.path.join('data', 'escalas'))
+    lote.add_argument('--processos', type=int, default=None)
+    lote.set_defaults(funcao=comando_lote)
+
+    return parser
+
+def main(argv=None):
+    from data_manager import ErroPersistencia
+
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+    args = criar_parser().parse_args(argv)
+    try:
+        return args.funcao(args)
+    except ErroPersistencia:
+        # A mensagem já foi registrada pelo logger da camada de dados
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
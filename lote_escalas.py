@@ -0,0 +1,63 @@
+import csv
+import hashlib
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from escala_generator import agrupar_funcionarios_por_funcao, gerar_escala_codificada, minimos_do_turno, obter_colunas_dias, escala_para_linhas
+
+def _nome_arquivo(nome):
+    # Parte legível seguida de um hash curto do nome original: 'A/B' e 'A_B' (ou 'A' e 'a' em sistemas
+    # que ignoram maiúsculas) não caem no mesmo caminho
+    legivel = re.sub(r'[^\w\-. ]', '_', nome).strip() or '_'
+    return f"{legivel}-{hashlib.sha1(nome.encode('utf-8')).hexdigest()[:8]}"
+
+def escrever_escala_csv(escalas, arquivo):
+    # Escreve as escalas (do mesmo período) em um único CSV, sem passar pelo pandas; arquivo pode ser
+    # um caminho ou um arquivo já aberto (como sys.stdout)
+    if not isinstance(arquivo, (str, os.PathLike)):
+        escritor = csv.writer(arquivo)
+        escritor.writerow(['Funcionário'] + obter_colunas_dias(escalas[0].calendario))
+        for escala in escalas:
+            escritor.writerows(escala_para_linhas(escala))
+        return
+    with open(arquivo, 'w', newline='', encoding='utf-8') as file:
+        escrever_escala_csv(escalas, file)
+
+def _gerar_escala_lote(nome_empresa, turno, funcionarios_por_funcao, minimos, data_inicio, ferias, dias_trabalho, dias_folga, meses, pasta_saida):
+    inicio = time.perf_counter()
+    escala = gerar_escala_codificada(funcionarios_por_funcao, data_inicio, ferias, dias_trabalho, dias_folga, meses, minimos)
+
+    pasta_empresa = os.path.join(pasta_saida, _nome_arquivo(nome_empresa))
+    os.makedirs(pasta_empresa, exist_ok=True)
+    arquivo = os.path.join(pasta_empresa, f'{_nome_arquivo(turno)}.csv')
+    escrever_escala_csv([escala], arquivo)
+
+    return nome_empresa, turno, len(escala.nomes), time.perf_counter() - inicio, arquivo
+
+def gerar_escalas_em_lote(empresas, data_inicio, pasta_saida, ferias='', dias_trabalho=5, dias_folga=1, meses=1, max_processos=None):
+    # Cada par empresa/turno vira uma tarefa independente no pool de processos
+    tarefas = []
+    for nome_empresa, empresa in empresas.items():
+        for turno, funcionarios_turno in empresa.funcionarios.items():
+            if funcionarios_turno:
+                funcionarios_por_funcao = agrupar_funcionarios_por_funcao(funcionarios_turno)
+                tarefas.append((nome_empresa, turno, funcionarios_por_funcao, minimos_do_turno(empresa.efetivo_minimo, turno)))
+
+    resultados = {}
+    with ProcessPoolExecutor(max_workers=max_processos) as executor:
+        futuros = [
+            executor.submit(
+                _gerar_escala_lote, nome_empresa, turno, funcionarios_por_funcao, minimos,
+                data_inicio, ferias, dias_trabalho, dias_folga, meses, pasta_saida
+            )
+            for nome_empresa, turno, funcionarios_por_funcao, minimos in tarefas
+        ]
+        for futuro in as_completed(futuros):
+            nome_empresa, turno, linhas, segundos, arquivo = futuro.result()
+            relatorio = resultados.setdefault(nome_empresa, {'funcionarios': 0, 'segundos': 0.0, 'arquivos': []})
+            relatorio['funcionarios'] += linhas
+            relatorio['segundos'] += segundos
+            relatorio['arquivos'].append(arquivo)
+
+    return resultados
@@ -1,21 +1,176 @@
+import math
+import re
+import threading
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+
+MINUTOS_DIA = 24 * 60
+
+def _formatar_minutos(minutos):
+    return f"{minutos // 60 % 24:02d}:{minutos % 60:02d}"
+
+class Jornada:
+    # Horário de trabalho em minutos desde a meia-noite; o fim passa de 1440 quando vira a noite
+    __slots__ = ('inicio', 'fim', 'rotulo')
+
+    def __init__(self, inicio, fim):
+        self.inicio = inicio
+        self.fim = fim
+        self.rotulo = f"{_formatar_minutos(inicio)} as {_formatar_minutos(fim)}"
+
+_jornadas = {}
+_trava_jornadas = threading.Lock()
+
+def obter_jornada(inicio, fim):
+    # Uma instância por horário, compartilhada por todos os funcionários com o mesmo horário
+    inicio %= MINUTOS_DIA
+    fim %= MINUTOS_DIA
+    if fim <= inicio:
+        fim += MINUTOS_DIA
+    with _trava_jornadas:
+        jornada = _jornadas.get((inicio, fim))
+        if jornada is None:
+            jornada = _jornadas[(inicio, fim)] = Jornada(inicio, fim)
+    return jornada
+
+_padrao_horario = re.compile(r'(\d{1,2}):(\d{2})\s*(?:as|às|a|-)\s*(\d{1,2}):(\d{2})')
+
+@lru_cache(maxsize=None)
+def interpretar_horario(horario):
+    # '22:00 as 06:00' -> Jornada(inicio=1320, fim=1800); None se o texto não tiver um horário
+    encontrado = _padrao_horario.search(horario or '')
+    if encontrado is None:
+        return None
+    hora_inicio, minuto_inicio, hora_fim, minuto_fim = map(int, encontrado.groups())
+    return obter_jornada(hora_inicio * 60 + minuto_inicio, hora_fim * 60 + minuto_fim)
+
+# Ciclo padrão de trabalho/folga (5x1)
+DIAS_CICLO = 6
+
+def escolher_ancora_ciclo(ancora, ancoras_grupo, dias_ciclo=DIAS_CICLO):
+    # Avança a âncora até a fase do ciclo menos usada no grupo (mesma empresa, turno e função), sem
+    # repetir a linha de ninguém, para que quem é cadastrado no mesmo dia não folgue junto.
+    # Os domingos de folga giram com 4 ou 5 domingos por mês, então o período cobre todas as combinações.
+    periodo = math.lcm(dias_ciclo, 20)
+    try:
+        dia = date.fromisoformat(ancora).toordinal()
+        residuos = Counter(date.fromisoformat(outra).toordinal() % periodo for outra in ancoras_grupo if outra)
+    except (TypeError, ValueError):
+        return ancora
+    fases = Counter()
+    for residuo, quantidade in residuos.items():
+        fases[residuo % dias_ciclo] += quantidade
+
+    def custo(avanco):
+        residuo = (dia + avanco) % periodo
+        return fases[residuo % dias_ciclo], residuos[residuo], avanco
+
+    return date.fromordinal(dia + min(range(periodo), key=custo)).isoformat()
+
 class Funcionario:
-    def __init__(self, nome, funcao, familia, horario, data_inicio, turno):
+    # Sem __dict__ por instância: rosters grandes ficam em memória em cada sessão
+    __slots__ = ('nome', 'funcao', 'familia', 'jornada', '_horario_texto', 'data_inicio', 'turno', 'ancora_ciclo', 'ferias', 'ajustes', 'id')
+
+    def __init__(self, nome, funcao, familia, horario, data_inicio, turno, ancora_ciclo=None, ferias=None, ajustes=None):
         self.nome = nome
         self.funcao = funcao
         self.familia = familia
-        self.horario = horario
+        # horario pode ser uma Jornada ou o texto '06:00 as 14:00', interpretado uma única vez
+        self.jornada = horario if isinstance(horario, Jornada) else interpretar_horario(horario)
+        self._horario_texto = None if self.jornada else horario
         self.data_inicio = data_inicio
         self.turno = turno
+        # Dia em que o ciclo de trabalho/folga do funcionário começa
+        self.ancora_ciclo = ancora_ciclo or data_inicio
+        # Períodos de férias como pares (inicio, fim) de datas 'AAAA-MM-DD', inclusivos; a tupla
+        # vazia é compartilhada por todos os funcionários sem férias
+        self.ferias = tuple(tuple(periodo) for periodo in ferias or ())
+        # Células editadas à mão como pares ('AAAA-MM-DD', rótulo), aplicadas por cima da escala gerada
+        self.ajustes = tuple(sorted(dict(ajustes or ()).items()))
+        self.id = None
+
+    @property
+    def horario(self):
+        return self.jornada.rotulo if self.jornada else self._horario_texto
+
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'nome': self.nome,
+            'funcao': self.funcao,
+            'familia': self.familia,
+            'horario': self.horario,
+            'data_inicio': self.data_inicio,
+            'turno': self.turno,
+            'ancora_ciclo': self.ancora_ciclo,
+            'ferias': [list(periodo) for periodo in self.ferias],
+            'ajustes': dict(self.ajustes),
+        }
+
+    @classmethod
+    def from_dict(cls, dados):
+        funcionario = cls(
+            dados['nome'],
+            dados['funcao'],
+            dados['familia'],
+            dados['horario'],
+            dados['data_inicio'],
+            dados['turno'],
+            dados.get('ancora_ciclo'),
+            dados.get('ferias'),
+            dados.get('ajustes')
+        )
+        funcionario.id = dados.get('id')
+        return funcionario
 
 class Empresa:
+    __slots__ = ('nome', 'funcionarios', 'folguistas', 'folguistas_escala', 'efetivo_minimo', 'versao')
+
     def __init__(self, nome):
         self.nome = nome
         self.funcionarios = {'Turno 1': [], 'Turno 2': [], 'Turno 3': []}
         self.folguistas = []
         self.folguistas_escala = None
+        # {(funcao, turno): [mínimo de segunda, ..., mínimo de domingo]}
+        self.efetivo_minimo = {}
+        # Versão gravada no banco quando a empresa foi carregada
+        self.versao = 0
 
     def adicionar_funcionario(self, funcionario):
         self.funcionarios[funcionario.turno].append(funcionario)
 
     def adicionar_folguista(self, nome):
-        self.folguistas.append(nome)
\ No newline at end of file
+        self.folguistas.append(nome)
+
+    def to_dict(self):
+        # Mesmo formato do antigo data/empresas.json, com os campos novos opcionais
+        return {
+            'funcionarios': {
+                turno: [funcionario.to_dict() for funcionario in funcionarios]
+                for turno, funcionarios in self.funcionarios.items()
+            },
+            'folguistas': list(self.folguistas),
+            'folguistas_escala': self.folguistas_escala,
+            'efetivo_minimo': [
+                {'funcao': funcao, 'turno': turno, 'minimos': list(minimos)}
+                for (funcao, turno), minimos in self.efetivo_minimo.items()
+            ],
+            'versao': self.versao,
+        }
+
+    @classmethod
+    def from_dict(cls, nome, dados):
+        empresa = cls(nome)
+        for funcionarios in dados.get('funcionarios', {}).values():
+            for funcionario in funcionarios:
+                empresa.adicionar_funcionario(Funcionario.from_dict(funcionario))
+        empresa.folguistas = list(dados.get('folguistas', []))
+        empresa.folguistas_escala = dados.get('folguistas_escala')
+        empresa.efetivo_minimo = {
+            (item['funcao'], item['turno']): list(item['minimos'])
+            for item in dados.get('efetivo_minimo', [])
+        }
+        empresa.versao = dados.get('versao', 0)
+        return empresa
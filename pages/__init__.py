@@ -1,6 +1,17 @@
-from .cadastro_empresa import app as cadastro_empresa
-from .cadastro_funcionario import app as cadastro_funcionario
-from .cadastro_folguista import app as cadastro_folguista
-from .gerar_escala import app as gerar_escala
-from .gerar_escala_folguista import app as gerar_escala_folguista
+from importlib import import_module
 
+# Rótulo do menu -> módulo da página. O módulo só é importado quando a página é aberta pela primeira vez.
+PAGINAS = {
+    "🏢 Cadastro de Empresa": 'cadastro_empresa',
+    "👤 Cadastro de Funcionário": 'cadastro_funcionario',
+    "🔄 Cadastro de Folguista": 'cadastro_folguista',
+    "📅 Gerar Escala": 'gerar_escala',
+    "📊 Gerar Escala Folguista": 'gerar_escala_folguista',
+}
+
+def registrar_pagina(rotulo, modulo):
+    PAGINAS[rotulo] = modulo
+
+def carregar_pagina(rotulo):
+    # import_module reaproveita o módulo já carregado em sys.modules
+    return import_module(f'{__name__}.{PAGINAS[rotulo]}').app
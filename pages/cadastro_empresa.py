@@ -1,6 +1,9 @@
 import streamlit as st
-from data_manager import salvar_empresas
+import pandas as pd
+from data_manager import inserir_empresa, atualizar_efetivo_minimo, ErroPersistencia
+from escala_generator import otimizar_ancoras_efetivo
 from models import Empresa
+from utils import funcoes_familias, turnos_funcionarios, dias_semana
 
 def app():
     st.title('Cadastro de Empresas')
@@ -8,8 +11,46 @@ def app():
     nome_empresa = st.text_input('Nome da Empresa')
     if st.button('Cadastrar Empresa'):
         if nome_empresa not in st.session_state.empresas:
-            st.session_state.empresas[nome_empresa] = Empresa(nome_empresa)
-            salvar_empresas(st.session_state.empresas)
-            st.success(f'Empresa {nome_empresa} cadastrada com sucesso!')
+            try:
+                nova_empresa = Empresa(nome_empresa)
+                inserir_empresa(nova_empresa)
+                st.session_state.empresas[nome_empresa] = nova_empresa
+                st.success(f'Empresa {nome_empresa} cadastrada com sucesso!')
+            except ErroPersistencia as e:
+                st.error(str(e))
         else:
-            st.warning('Essa empresa já está cadastrada!')
\ No newline at end of file
+            st.warning('Essa empresa já está cadastrada!')
+
+    st.header('Efetivo Mínimo')
+    empresa_selecionada = st.selectbox('Selecione a Empresa', options=list(st.session_state.empresas.keys()))
+    if empresa_selecionada:
+        empresa = st.session_state.empresas[empresa_selecionada]
+        chaves = [(funcao, turno) for turno in turnos_funcionarios for funcao in funcoes_familias]
+        df_minimos = pd.DataFrame(
+            [list(chave) + list(empresa.efetivo_minimo.get(chave, [0] * 7)) for chave in chaves],
+            columns=['Função', 'Turno'] + dias_semana
+        )
+
+        st.write("Quantidade mínima de funcionários trabalhando por dia da semana:")
+        df_minimos_editado = st.data_editor(
+            df_minimos,
+            key=f"editor_minimos_{empresa_selecionada}",
+            num_rows="fixed",
+            disabled=['Função', 'Turno'],
+            hide_index=True,
+            column_config={dia: st.column_config.NumberColumn(min_value=0, step=1) for dia in dias_semana}
+        )
+
+        if st.button('Salvar Efetivo Mínimo'):
+            efetivo_minimo = {
+                chave: [int(minimo) for minimo in minimos]
+                for chave, minimos in zip(chaves, df_minimos_editado[dias_semana].fillna(0).values.tolist())
+                if any(minimos)
+            }
+            try:
+                # As âncoras que cobrem o novo efetivo são gravadas junto, e não recalculadas a cada escala.
+                # A empresa em cache é compartilhada entre sessões; a versão nova faz o repositório recarregá-la
+                atualizar_efetivo_minimo(empresa_selecionada, efetivo_minimo, otimizar_ancoras_efetivo(empresa, efetivo_minimo))
+                st.success('Efetivo mínimo salvo com sucesso!')
+            except ErroPersistencia as e:
+                st.error(str(e))
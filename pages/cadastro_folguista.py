@@ -1,7 +1,7 @@
 import streamlit as st
 import calendar
 from datetime import datetime
-from data_manager import salvar_empresas
+from data_manager import inserir_folguista, ErroPersistencia
 
 def app():
     st.title('Cadastro de Folguistas')
@@ -16,13 +16,12 @@ def app():
             data_atual = datetime.now()
             num_dias_no_mes = calendar.monthrange(data_atual.year, data_atual.month)[1]
             
-            if empresa.folguistas_escala is None:
-                empresa.folguistas_escala = []
-            
             novo_folguista = {'Folguista': f"{nome_folguista} (CP)"}
             novo_folguista.update({f'Dia {i+1}': '' for i in range(num_dias_no_mes)})
-            empresa.folguistas_escala.append(novo_folguista)
-            empresa.adicionar_folguista(nome_folguista)
-            
-            salvar_empresas(st.session_state.empresas)
-            st.success(f'Folguista {nome_folguista} (CP) cadastrado na empresa {empresa_selecionada}!')
\ No newline at end of file
+
+            try:
+                # A empresa em cache é compartilhada entre sessões; a versão nova faz o repositório recarregá-la
+                inserir_folguista(empresa_selecionada, nome_folguista, len(empresa.folguistas_escala or []), novo_folguista)
+                st.success(f'Folguista {nome_folguista} (CP) cadastrado na empresa {empresa_selecionada}!')
+            except ErroPersistencia as e:
+                st.error(str(e))
\ No newline at end of file
@@ -1,7 +1,8 @@
 import streamlit as st
 from datetime import datetime
-from data_manager import salvar_empresas
-from models import Funcionario
+from data_manager import inserir_funcionario, inserir_ferias, atualizar_ancoras_ciclo
+from escala_generator import otimizar_ancoras_efetivo
+from models import Funcionario, obter_jornada
 from utils import funcoes_familias, turnos_funcionarios
 
 def app():
@@ -19,17 +20,46 @@ def app():
     if st.button('Cadastrar Funcionário'):
         if empresa_selecionada:
             try:
-                horario_turno = f"{hora_inicio.strftime('%H:%M')} as {hora_fim.strftime('%H:%M')}"
+                jornada = obter_jornada(hora_inicio.hour * 60 + hora_inicio.minute, hora_fim.hour * 60 + hora_fim.minute)
                 novo_funcionario = Funcionario(
                     nome_funcionario,
                     funcao_funcionario,
                     familia_letras,
-                    horario_turno,
+                    jornada,
                     data_inicio_funcionario.strftime('%Y-%m-%d'),
                     turno_funcionario
                 )
-                st.session_state.empresas[empresa_selecionada].adicionar_funcionario(novo_funcionario)
-                salvar_empresas(st.session_state.empresas)
+                # A gravação muda a versão da empresa; o próximo acesso ao repositório já a recarrega com o novo funcionário
+                inserir_funcionario(empresa_selecionada, novo_funcionario)
+                # Com o quadro novo, só quem precisa muda de fase para manter o efetivo mínimo
+                ancoras_ciclo = otimizar_ancoras_efetivo(st.session_state.empresas[empresa_selecionada])
+                if ancoras_ciclo:
+                    atualizar_ancoras_ciclo(empresa_selecionada, ancoras_ciclo)
                 st.success(f'Funcionário {nome_funcionario} cadastrado com sucesso!')
             except Exception as e:
-                st.error(f'Erro ao cadastrar funcionário: {str(e)}')
\ No newline at end of file
+                st.error(f'Erro ao cadastrar funcionário: {str(e)}')
+
+    st.header('Cadastro de Férias')
+    if empresa_selecionada:
+        funcionarios_empresa = [
+            funcionario
+            for funcionarios_turno in st.session_state.empresas[empresa_selecionada].funcionarios.values()
+            for funcionario in funcionarios_turno
+        ]
+        funcionario_ferias = st.selectbox(
+            'Funcionário',
+            options=funcionarios_empresa,
+            format_func=lambda funcionario: f"{funcionario.nome} ({funcionario.turno})"
+        )
+        periodo_ferias = st.date_input('Período de Férias', value=(datetime.today(), datetime.today()))
+
+        if st.button('Cadastrar Férias'):
+            if funcionario_ferias is None or len(periodo_ferias) != 2:
+                st.error('Selecione um funcionário e as datas de início e fim das férias.')
+            else:
+                try:
+                    inicio, fim = (data.strftime('%Y-%m-%d') for data in periodo_ferias)
+                    inserir_ferias(empresa_selecionada, funcionario_ferias, inicio, fim)
+                    st.success(f'Férias de {funcionario_ferias.nome} cadastradas de {inicio} a {fim}!')
+                except Exception as e:
+                    st.error(f'Erro ao cadastrar férias: {str(e)}')
@@ -1,9 +1,143 @@
 import streamlit as st
-import pandas as pd
-import calendar
-from datetime import datetime
-from escala_generator import gerar_escala_turnos_por_funcao
-from utils import transformar_escala_para_dataframe, turnos_funcionarios
+from datetime import datetime, timedelta
+from arquivo_escalas import arquivar_escalas, escala_para_parquet
+from data_manager import salvar_ajustes_escala, ErroPersistencia
+from escala_generator import gerar_escala_turno, obter_colunas_dias, obter_calendario_mes, recortar_escala, rotulo_gerado
+from utils import (
+    obter_dataframe_escala, concatenar_dataframes_escala, filtrar_linhas_escala, paginar,
+    funcoes_familias, turnos_funcionarios
+)
+from validacao_escala import validar_escala_editada, listar_violacoes
+
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+# Janela de dias exibida por padrão; o resto do período fica no servidor até ser pedido
+DIAS_EXIBIDOS_PADRAO = 31
+
+def ajustes_editados(linhas_editadas, escala_codificada, funcionarios_por_id):
+    # Converte o delta do st.data_editor ({linha: {coluna: valor}}) em {Funcionario: {data: rótulo}}.
+    # Voltar uma célula ao rótulo gerado desfaz o ajuste salvo (rótulo vazio) em vez de gravar outro.
+    colunas_dias = obter_colunas_dias(escala_codificada.calendario)
+    indice_colunas = {coluna: dia for dia, coluna in enumerate(colunas_dias)}
+    ajustes = {}
+    for linha, colunas in linhas_editadas.items():
+        linha = int(linha)
+        funcionario = funcionarios_por_id.get(escala_codificada.ids[linha])
+        if funcionario is None:
+            continue
+        for coluna, valor in colunas.items():
+            if coluna not in indice_colunas:
+                continue
+            dia = indice_colunas[coluna]
+            ajustado = (linha, dia) in escala_codificada.codigos_gerados
+            if valor == rotulo_gerado(escala_codificada, linha, dia):
+                valor = ''
+            if valor or ajustado:
+                data = str(escala_codificada.calendario.datas[dia])
+                ajustes.setdefault(funcionario, {})[data] = valor or ''
+    return ajustes
+
+def mostrar_violacoes(escala_codificada, linhas_editadas):
+    violacoes = validar_escala_editada(escala_codificada, linhas_editadas)
+    if violacoes.any():
+        df_violacoes = listar_violacoes(violacoes, escala_codificada.nomes, obter_colunas_dias(escala_codificada.calendario))
+        st.warning(f'{len(df_violacoes)} violação(ões) de regras trabalhistas na escala.')
+        with st.expander('Ver violações'):
+            st.dataframe(df_violacoes, hide_index=True)
+
+def guardar_escala_editada(turno, df_escala, versao):
+    # Guarda a página editada para a Escala Final. Ela só é refeita nas execuções completas da página;
+    # quando só o painel do turno reexecuta e a edição mudou, avisa que a Escala Final ficou para trás.
+    if df_escala is None:
+        st.session_state.escalas_editadas.pop(turno, None)
+    else:
+        st.session_state.escalas_editadas[turno] = df_escala
+    if st.session_state.execucao_completa:
+        st.session_state.versoes_escala_final[turno] = versao
+    elif st.session_state.versoes_escala_final.get(turno) != versao:
+        st.info('A Escala Final ainda não inclui as últimas alterações deste turno; clique em "Atualizar Escala Final".')
+
+@st.fragment
+def painel_turno(nome_empresa, turno, data_inicio_str, ferias, meses, filtro):
+    # Editar, salvar ou trocar de página reexecuta só este painel; a página editada fica na sessão para a escala final.
+    # Só o recorte filtrado e paginado vira DataFrame e é enviado ao navegador.
+    funcoes, busca, dia_inicio, dia_fim, tamanho_pagina = filtro
+    # Busca a empresa a cada execução: depois de salvar, a versão nova faz o repositório recarregá-la
+    empresa = st.session_state.empresas[nome_empresa]
+    st.subheader(f'Escala {turno} - {empresa.nome}')
+    funcionarios_turno = empresa.funcionarios[turno]
+    if not funcionarios_turno:
+        guardar_escala_editada(turno, None, None)
+        return
+
+    escala_completa = gerar_escala_turno(empresa, turno, data_inicio_str, ferias, meses=meses)
+    linhas = filtrar_linhas_escala(escala_completa, funcoes, busca)
+    if not len(linhas):
+        st.info('Nenhum funcionário deste turno corresponde aos filtros.')
+        guardar_escala_editada(turno, None, None)
+        return
+
+    # O valor do widget vem só da sessão (sem value=), que também é onde o limite de páginas é ajustado
+    chave_pagina = f"pagina_{turno}"
+    _, total_paginas = paginar(linhas, 1, tamanho_pagina)
+    if chave_pagina not in st.session_state:
+        st.session_state[chave_pagina] = 1
+    elif st.session_state[chave_pagina] > total_paginas:
+        st.session_state[chave_pagina] = total_paginas
+    pagina = st.number_input(
+        f'Página (de {total_paginas}, {len(linhas)} funcionários)',
+        min_value=1, max_value=total_paginas, step=1, key=chave_pagina
+    )
+    linhas_pagina, _ = paginar(linhas, pagina, tamanho_pagina)
+
+    escala_codificada = recortar_escala(escala_completa, tuple(linhas_pagina.tolist()), dia_inicio, dia_fim)
+    df_escala = obter_dataframe_escala(escala_codificada)
+    for funcao, falta in escala_codificada.faltas.items():
+        if falta.any():
+            st.warning(f'{funcao}: efetivo mínimo não atingido em {int((falta > 0).sum())} dia(s).')
+
+    # O delta do editor é relativo ao recorte, então cada página/filtro tem o próprio editor
+    chave_editor = f"editor_{turno}_{pagina}_{dia_inicio}_{dia_fim}_{tamanho_pagina}_{','.join(funcoes)}_{busca}"
+    st.write(f"Edite a escala do {turno}:")
+    df_escala_editado = st.data_editor(
+        df_escala,
+        key=chave_editor,
+        disabled=["Funcionário"],
+        hide_index=True,
+    )
+    linhas_editadas = st.session_state.get(chave_editor, {}).get('edited_rows', {})
+
+    if st.button(f'Salvar Alterações - {turno}'):
+        ajustes = ajustes_editados(
+            linhas_editadas,
+            escala_codificada,
+            {funcionario.id: funcionario for funcionario in funcionarios_turno}
+        )
+        try:
+            if ajustes:
+                salvar_ajustes_escala(empresa.nome, ajustes)
+            st.success(f'Alterações na escala do {turno} salvas com sucesso!')
+        except ErroPersistencia as e:
+            st.error(str(e))
+
+    # As regras valem por funcionário, então cada turno é validado só com as próprias linhas
+    mostrar_violacoes(escala_codificada, linhas_editadas)
+    versao = (chave_editor, {linha: dict(colunas) for linha, colunas in linhas_editadas.items()})
+    guardar_escala_editada(turno, df_escala_editado, versao)
+
+def painel_escala_final():
+    st.subheader('Escala Final')
+    # Fora de fragmento: toda execução completa da página a refaz com as páginas editadas de cada turno.
+    # O botão força essa execução depois de edições que só reexecutaram o painel de um turno.
+    st.button('Atualizar Escala Final')
+    lista_dataframes = [
+        st.session_state.escalas_editadas[turno]
+        for turno in turnos_funcionarios
+        if turno in st.session_state.escalas_editadas
+    ]
+    if lista_dataframes:
+        df_final = concatenar_dataframes_escala(lista_dataframes)
+        st.write("Visualização da escala final:")
+        st.dataframe(df_final, hide_index=True)
 
 def app():
     st.title('Geração de Escala')
@@ -11,51 +145,61 @@ def app():
     empresa_selecionada = st.selectbox('Selecione a Empresa', options=list(st.session_state.empresas.keys()))
     data_inicio = st.date_input('Data de Início da Escala', value=datetime.today())
     data_inicio_str = data_inicio.strftime('%Y-%m-%d')
-    ferias = st.text_input('Nome do Funcionário de Férias')
+    meses = st.number_input('Número de Meses', min_value=1, max_value=12, value=1)
+    ferias = st.text_input('Funcionários de Férias em Todo o Período (separados por vírgula)')
+
+    with st.expander('Filtros e Paginação'):
+        turnos_exibidos = st.multiselect('Turnos', options=turnos_funcionarios, default=turnos_funcionarios)
+        funcoes = st.multiselect('Funções', options=list(funcoes_familias.keys()))
+        busca = st.text_input('Buscar Funcionário')
+        calendario = obter_calendario_mes(data_inicio_str, meses)
+        primeiro_dia = calendario.datas[0].astype(object)
+        ultimo_dia = calendario.datas[-1].astype(object)
+        janela = st.slider(
+            'Período Exibido',
+            min_value=primeiro_dia,
+            max_value=ultimo_dia,
+            value=(primeiro_dia, min(ultimo_dia, primeiro_dia + timedelta(days=DIAS_EXIBIDOS_PADRAO - 1))),
+            format='DD/MM/YYYY'
+        )
+        tamanho_pagina = st.selectbox('Funcionários por Página', options=TAMANHOS_PAGINA, index=1)
+
+    filtro = (
+        tuple(funcoes), busca.strip(),
+        (janela[0] - primeiro_dia).days, (janela[1] - primeiro_dia).days + 1,
+        tamanho_pagina
+    )
 
     if empresa_selecionada and st.session_state.empresas[empresa_selecionada].funcionarios:
-        lista_dataframes = []
-
-        for turno in turnos_funcionarios:
-            st.subheader(f'Escala {turno} - {empresa_selecionada}')
-            funcionarios_turno = st.session_state.empresas[empresa_selecionada].funcionarios[turno]
-
-            if funcionarios_turno:
-                funcionarios_por_funcao = {}
-                for func in funcionarios_turno:
-                    funcao = func.funcao
-                    nome = f"{func.nome} ({func.familia})"
-                    if funcao not in funcionarios_por_funcao:
-                        funcionarios_por_funcao[funcao] = {}
-                    funcionarios_por_funcao[funcao][nome] = {
-                        'horario': func.horario,
-                        'data_inicio': func.data_inicio,
-                        'turno': func.turno
-                    }
-
-                escala_por_funcao = gerar_escala_turnos_por_funcao(funcionarios_por_funcao, data_inicio_str, ferias)
-                num_dias_no_mes = calendar.monthrange(data_inicio.year, data_inicio.month)[1]
-                df_escala = transformar_escala_para_dataframe(escala_por_funcao, num_dias_no_mes)
-                
-                st.write(f"Edite a escala do {turno}:")
-                df_escala_editado = st.data_editor(
-                    df_escala,
-                    key=f"editor_{turno}",
-                    disabled=["Funcionário"],
-                    hide_index=True,
-                )
-                
-                if st.button(f'Salvar Alterações - {turno}'):
-                    st.success(f'Alterações na escala do {turno} salvas com sucesso!')
-                
-                lista_dataframes.append(df_escala_editado)
-
-        if lista_dataframes:
-            df_final = pd.concat(lista_dataframes, ignore_index=True)
-            st.subheader('Escala Final')
-            
-            st.write("Visualização da escala final:")
-            st.dataframe(df_final, hide_index=True)
-            
+        empresa = st.session_state.empresas[empresa_selecionada]
+        st.session_state.escalas_editadas = {}
+        st.session_state.setdefault('versoes_escala_final', {})
+        st.session_state.execucao_completa = True
+
+        for turno in turnos_exibidos:
+            painel_turno(empresa.nome, turno, data_inicio_str, ferias, meses, filtro)
+
+        painel_escala_final()
+        # Daqui em diante, até a próxima execução completa, só os painéis de turno reexecutam
+        st.session_state.execucao_completa = False
+
+        # Exporta o período inteiro de todos os turnos, com os ajustes já salvos, sem filtros nem paginação
+        if st.button('Exportar Escala'):
+            escalas = [
+                gerar_escala_turno(empresa, turno, data_inicio_str, ferias, meses=meses)
+                for turno in turnos_funcionarios
+                if empresa.funcionarios[turno]
+            ]
+            try:
+                arquivar_escalas(empresa.nome, escalas)
+                st.success(f'Escala da empresa {empresa.nome} arquivada por mês.')
+            except OSError as e:
+                st.error(f'Não foi possível arquivar a escala: {e}')
+            st.download_button(
+                label="Download Parquet",
+                data=escala_para_parquet(empresa.nome, escalas),
+                file_name=f"escala_{empresa.nome}_{data_inicio_str}.parquet",
+                mime="application/octet-stream",
+            )
     else:
-        st.warning('Selecione uma empresa com funcionários cadastrados para gerar a escala.')
\ No newline at end of file
+        st.warning('Selecione uma empresa com funcionários cadastrados para gerar a escala.')
@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
-from data_manager import salvar_empresas
+from datetime import datetime
+from data_manager import atualizar_escala_folguistas, ErroPersistencia
+from escala_generator import gerar_escala_turno, IndiceCobertura, obter_colunas_dias
+from alocacao_folguistas import alocar_folguistas
 
 def app():
     st.title('Escala de Folguistas')
@@ -9,7 +12,40 @@ def app():
 
     if empresa_selecionada:
         empresa = st.session_state.empresas[empresa_selecionada]
-        
+
+        st.header('Alocação Automática')
+        data_inicio = st.date_input('Data de Início da Escala', value=datetime.today())
+        meses = st.number_input('Número de Meses', min_value=1, max_value=12, value=1, step=1)
+        cobertura = IndiceCobertura([
+            gerar_escala_turno(empresa, turno, data_inicio.strftime('%Y-%m-%d'), '', meses=meses)
+            for turno, funcionarios_turno in empresa.funcionarios.items()
+            if funcionarios_turno
+        ])
+
+        if cobertura.grupos:
+            with st.expander('Funcionários ausentes por dia'):
+                st.dataframe(pd.DataFrame(
+                    cobertura.contagem_ausentes,
+                    index=obter_colunas_dias(cobertura.calendario),
+                    columns=pd.MultiIndex.from_tuples(list(cobertura.grupos), names=['Turno', 'Função'])
+                ).sort_index(axis=1))
+
+        if st.button('Alocar Folguistas'):
+            if not empresa.folguistas:
+                st.warning('Cadastre ao menos um folguista para esta empresa.')
+            else:
+                try:
+                    registros, descobertas = alocar_folguistas(cobertura, empresa.folguistas)
+                    atualizar_escala_folguistas(empresa_selecionada, registros)
+                    # Relê do repositório, que já recarregou a empresa pela versão nova
+                    empresa = st.session_state.empresas[empresa_selecionada]
+                    st.session_state.pop('editor_folguistas', None)
+                    st.success('Folguistas alocados automaticamente!')
+                    if descobertas:
+                        st.warning(f'{len(descobertas)} folgas ficaram sem folguista.')
+                except ErroPersistencia as e:
+                    st.error(str(e))
+
         st.header('Escala de Folguistas')
         if empresa.folguistas_escala:
             df_folguistas = pd.DataFrame(empresa.folguistas_escala)
@@ -26,9 +62,12 @@ def app():
         )
         
         if st.button('Salvar Alterações - Folguistas'):
-            empresa.folguistas_escala = df_folguistas_editado.to_dict('records')
-            salvar_empresas(st.session_state.empresas)
-            st.success('Alterações na escala de folguistas salvas com sucesso!')
+            try:
+                registros = df_folguistas_editado.to_dict('records')
+                atualizar_escala_folguistas(empresa_selecionada, registros)
+                st.success('Alterações na escala de folguistas salvas com sucesso!')
+            except ErroPersistencia as e:
+                st.error(str(e))
 
         # Adicionar opção de exportação
         if st.button('Exportar Escala'):
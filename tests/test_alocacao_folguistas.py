@@ -0,0 +1,29 @@
+import unittest
+import pandas as pd
+from models import Empresa, Funcionario
+from escala_generator import gerar_escala_turno, IndiceCobertura
+from alocacao_folguistas import alocar_folguistas
+from validacao_escala import validar_dataframe_escala
+
+HORARIOS = ['06:00 as 14:00', '14:00 as 22:00', '22:00 as 06:00']
+
+class TestAlocacaoFolguistas(unittest.TestCase):
+    # Mesmo com folgas de sobra para cobrir, o folguista tem as próprias folgas e cumpre as regras trabalhistas
+    def test_folguistas_respeitam_regras_trabalhistas(self):
+        empresa = Empresa('Posto')
+        for i in range(60):
+            empresa.adicionar_funcionario(Funcionario(
+                f'N{i}', ['Caixa', 'Frentista'][i % 2], 'A', HORARIOS[i % 3], f'2024-01-0{i % 6 + 1}', f'Turno {i % 3 + 1}'
+            ))
+        for quantidade, meses in ((1, 1), (4, 2)):
+            with self.subTest(folguistas=quantidade, meses=meses):
+                cobertura = IndiceCobertura([gerar_escala_turno(empresa, turno, '2024-01-01', '', meses=meses) for turno in empresa.funcionarios])
+                registros, _ = alocar_folguistas(cobertura, [f'F{i}' for i in range(quantidade)])
+                df_folguistas = pd.DataFrame(registros).replace('', None)
+                colunas_dias = list(df_folguistas.columns[1:])
+                violacoes = validar_dataframe_escala(df_folguistas, cobertura.calendario, colunas_dias)
+                self.assertFalse(violacoes.any())
+                self.assertTrue(df_folguistas[colunas_dias].isna().any(axis=1).all())
+
+if __name__ == '__main__':
+    unittest.main()
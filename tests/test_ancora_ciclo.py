@@ -0,0 +1,19 @@
+import unittest
+from models import escolher_ancora_ciclo
+
+class TestAncoraCiclo(unittest.TestCase):
+    def test_cadastrados_no_mesmo_dia_recebem_fases_distintas(self):
+        ancoras = []
+        for _ in range(6):
+            ancoras.append(escolher_ancora_ciclo('2026-10-01', ancoras))
+        self.assertEqual(ancoras, [f'2026-10-0{dia}' for dia in range(1, 7)])
+
+    def test_ancora_livre_nao_muda(self):
+        self.assertEqual(escolher_ancora_ciclo('2026-10-04', ['2026-10-01', '2026-10-02']), '2026-10-04')
+
+    def test_setimo_repete_a_fase_sem_repetir_a_linha(self):
+        ancoras = [f'2026-10-0{dia}' for dia in range(1, 7)]
+        self.assertEqual(escolher_ancora_ciclo('2026-10-01', ancoras), '2026-10-07')
+
+if __name__ == '__main__':
+    unittest.main()
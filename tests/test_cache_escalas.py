@@ -0,0 +1,26 @@
+import gc
+import unittest
+import weakref
+import escala_generator
+import utils
+from models import Empresa, Funcionario
+
+class TestCacheEscalas(unittest.TestCase):
+    def test_invalidar_libera_recortes_e_dataframes(self):
+        empresa = Empresa('Posto Cache')
+        for i in range(4):
+            empresa.adicionar_funcionario(Funcionario(f'C{i}', 'Caixa', 'C', '06:00 as 14:00', '2026-10-01', 'Turno 1'))
+        escala = escala_generator.gerar_escala_turno(empresa, 'Turno 1', '2026-10-01', '')
+        recorte = escala_generator.recortar_escala(escala, (0, 2), 0, 10)
+        utils.obter_dataframe_escala(recorte)
+        referencia = weakref.ref(escala)
+        del escala, recorte
+
+        # Como faz o observador do app.py quando a empresa é alterada
+        escala_generator.invalidar_escalas('Posto Cache')
+        utils.obter_dataframe_escala.cache_clear()
+        gc.collect()
+        self.assertIsNone(referencia())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+import numpy as np
+import data_manager
+from escala_generator import FOLGA, TRABALHO, gerar_escala_turno, obter_colunas_dias, rotulo_gerado
+from models import Empresa, Funcionario
+from pages.gerar_escala import ajustes_editados
+
+class TestDataManager(unittest.TestCase):
+    # Cada teste usa um diretório novo: o banco e o JSON antigo ficam em data/ relativo ao diretório atual
+    def setUp(self):
+        self._diretorio_anterior = os.getcwd()
+        self._pasta = tempfile.TemporaryDirectory()
+        os.chdir(self._pasta.name)
+        self._janela = data_manager.JANELA_FSYNC_SEGUNDOS
+        data_manager.JANELA_FSYNC_SEGUNDOS = 0
+
+    def tearDown(self):
+        data_manager.JANELA_FSYNC_SEGUNDOS = self._janela
+        os.chdir(self._diretorio_anterior)
+        self._pasta.cleanup()
+
+    def _funcionario(self, nome, **extras):
+        return Funcionario(nome, 'Caixa', 'C', '06:00 as 14:00', '2026-10-01', 'Turno 1', **extras)
+
+    def test_migracao_do_json(self):
+        os.makedirs('data')
+        with open(data_manager.arquivo_empresas, 'w') as file:
+            json.dump({'Posto A': {
+                'funcionarios': {'Turno 1': [{
+                    'nome': 'Ana', 'funcao': 'Caixa', 'familia': 'C', 'horario': '06:00 as 14:00',
+                    'data_inicio': '2026-10-01', 'turno': 'Turno 1'
+                }]},
+                'folguistas': ['Zé'],
+                'folguistas_escala': [{'Folguista': 'Zé (CP)', 'Dia 1': ''}],
+            }}, file)
+        empresa = data_manager.RepositorioEmpresas()['Posto A']
+        self.assertEqual([f.nome for f in empresa.funcionarios['Turno 1']], ['Ana'])
+        self.assertEqual(empresa.folguistas, ['Zé'])
+        self.assertEqual(empresa.folguistas_escala, [{'Folguista': 'Zé (CP)', 'Dia 1': ''}])
+
+    def test_funcionario_ferias_e_ajustes_sobrevivem_a_recarga(self):
+        data_manager.inserir_empresa(Empresa('Posto A'))
+        funcionario = self._funcionario('Ana')
+        data_manager.inserir_funcionario('Posto A', funcionario)
+        data_manager.inserir_ferias('Posto A', funcionario, '2026-10-10', '2026-10-20')
+        data_manager.salvar_ajustes_escala('Posto A', {funcionario: {'2026-10-03': 'Folga'}})
+
+        recarregado = data_manager.carregar_empresa('Posto A').funcionarios['Turno 1'][0]
+        self.assertEqual(recarregado.id, funcionario.id)
+        self.assertEqual(recarregado.horario, '06:00 as 14:00')
+        self.assertEqual(recarregado.ferias, (('2026-10-10', '2026-10-20'),))
+        self.assertEqual(recarregado.ajustes, (('2026-10-03', 'Folga'),))
+
+        data_manager.salvar_ajustes_escala('Posto A', {recarregado: {'2026-10-03': ''}})
+        self.assertEqual(data_manager.carregar_empresa('Posto A').funcionarios['Turno 1'][0].ajustes, ())
+
+    def test_ajuste_da_tela_volta_do_banco_na_escala_regerada(self):
+        data_manager.inserir_empresa(Empresa('Posto A'))
+        for nome in ('Ana', 'Bia'):
+            data_manager.inserir_funcionario('Posto A', self._funcionario(nome))
+        repositorio = data_manager.RepositorioEmpresas()
+
+        def gerar():
+            empresa = repositorio['Posto A']
+            funcionarios_por_id = {funcionario.id: funcionario for funcionario in empresa.funcionarios['Turno 1']}
+            return gerar_escala_turno(empresa, 'Turno 1', '2026-10-01', ''), funcionarios_por_id
+
+        escala, funcionarios_por_id = gerar()
+        dia = int(np.flatnonzero(escala.codigos[0] == TRABALHO)[0])
+        coluna = obter_colunas_dias(escala.calendario)[dia]
+        rotulo_trabalho = rotulo_gerado(escala, 0, dia)
+        # Reeditar a célula com o próprio rótulo gerado não grava nada
+        self.assertEqual(ajustes_editados({0: {coluna: rotulo_trabalho}}, escala, funcionarios_por_id), {})
+
+        ajustes = ajustes_editados({0: {coluna: 'Folga'}}, escala, funcionarios_por_id)
+        self.assertEqual(list(ajustes.values()), [{str(escala.calendario.datas[dia]): 'Folga'}])
+        data_manager.salvar_ajustes_escala('Posto A', ajustes)
+        escala, funcionarios_por_id = gerar()
+        self.assertEqual(escala.codigos[0, dia], FOLGA)
+        self.assertEqual(rotulo_gerado(escala, 0, dia), rotulo_trabalho)
+
+        # Voltar ao rótulo gerado desfaz o ajuste salvo
+        data_manager.salvar_ajustes_escala('Posto A', ajustes_editados({0: {coluna: rotulo_trabalho}}, escala, funcionarios_por_id))
+        escala, funcionarios_por_id = gerar()
+        self.assertEqual(escala.codigos[0, dia], TRABALHO)
+        self.assertEqual(escala.codigos_gerados, {})
+        self.assertEqual(funcionarios_por_id[escala.ids[0]].ajustes, ())
+
+    def test_cada_escrita_incrementa_a_versao(self):
+        data_manager.inserir_empresa(Empresa('Posto A'))
+        versoes = [data_manager.versao_empresa('Posto A')]
+        data_manager.inserir_funcionario('Posto A', self._funcionario('Ana'))
+        versoes.append(data_manager.versao_empresa('Posto A'))
+        data_manager.atualizar_efetivo_minimo('Posto A', {('Caixa', 'Turno 1'): [1] * 7})
+        versoes.append(data_manager.versao_empresa('Posto A'))
+        data_manager.atualizar_escala_folguistas('Posto A', [{'Folguista': 'Zé (CP)'}])
+        versoes.append(data_manager.versao_empresa('Posto A'))
+        self.assertEqual(versoes, sorted(set(versoes)))
+
+        repositorio = data_manager.RepositorioEmpresas()
+        antes = repositorio['Posto A']
+        data_manager.inserir_funcionario('Posto A', self._funcionario('Bia'))
+        depois = repositorio['Posto A']
+        self.assertIsNot(antes, depois)
+        self.assertEqual(len(antes.funcionarios['Turno 1']), 1)
+        self.assertEqual(len(depois.funcionarios['Turno 1']), 2)
+
+    def test_grade_de_folguistas_remove_linhas_e_colunas_ausentes(self):
+        data_manager.inserir_empresa(Empresa('Posto A'))
+        data_manager.atualizar_escala_folguistas('Posto A', [
+            {'Folguista': 'A', **{f'Dia {dia}': 'x' for dia in range(1, 32)}},
+            {'Folguista': 'B', 'Dia 1': 'y'},
+        ])
+        data_manager.atualizar_escala_folguistas('Posto A', [{'Folguista': 'A', **{f'Dia {dia}': 'z' for dia in range(1, 31)}}])
+        grade = data_manager.carregar_empresa('Posto A').folguistas_escala
+        self.assertEqual(len(grade), 1)
+        self.assertEqual(list(grade[0]), ['Folguista'] + [f'Dia {dia}' for dia in range(1, 31)])
+
+        data_manager.atualizar_escala_folguistas('Posto A', [{'Folguista': 'A', '2026-10-01': 'w'}])
+        self.assertEqual(data_manager.carregar_empresa('Posto A').folguistas_escala, [{'Folguista': 'A', '2026-10-01': 'w'}])
+
+    def test_empresa_duplicada_nao_apaga_a_existente(self):
+        data_manager.inserir_empresa(Empresa('Posto A'))
+        data_manager.inserir_funcionario('Posto A', self._funcionario('Ana'))
+        with self.assertRaises(data_manager.ErroPersistencia):
+            data_manager.inserir_empresa(Empresa('Posto A'))
+        self.assertEqual(len(data_manager.carregar_empresa('Posto A').funcionarios['Turno 1']), 1)
+
+    def test_threads_reaproveitam_conexoes(self):
+        data_manager.inserir_empresa(Empresa('Posto A'))
+        conexoes = set()
+
+        def ler():
+            data_manager.versao_empresa('Posto A')
+            conexoes.add(id(data_manager._conexao()))
+
+        # Threads sucessivas, como as reexecuções do Streamlit, voltam a usar a conexão devolvida ao pool
+        for _ in range(5):
+            thread = threading.Thread(target=ler)
+            thread.start()
+            thread.join()
+        self.assertEqual(len(conexoes), 1)
+
+if __name__ == '__main__':
+    unittest.main()
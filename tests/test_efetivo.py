@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+from escala_generator import agrupar_funcionarios_por_funcao, gerar_escala_codificada, otimizar_ancoras_efetivo
+from models import Empresa, Funcionario
+
+# Segunda a sábado e domingo: com 12 pessoas em 5x1 e um domingo de folga por mês, dá para cobrir
+EFETIVO_MINIMO = {('Caixa', 'Turno 1'): [9, 9, 9, 9, 9, 9, 8]}
+
+def montar_empresa(ancoras):
+    empresa = Empresa('Posto Efetivo')
+    for i, ancora in enumerate(ancoras):
+        funcionario = Funcionario(f'C{i}', 'Caixa', 'C', '06:00 as 14:00', '2026-10-01', 'Turno 1', ancora)
+        funcionario.id = i + 1
+        empresa.adicionar_funcionario(funcionario)
+    empresa.efetivo_minimo = EFETIVO_MINIMO
+    return empresa
+
+def gravar_ancoras(empresa, ancoras_ciclo):
+    # O que data_manager.atualizar_ancoras_ciclo faz no banco
+    for funcionario in empresa.funcionarios['Turno 1']:
+        funcionario.ancora_ciclo = ancoras_ciclo.get(funcionario.id, funcionario.ancora_ciclo)
+
+def gerar(empresa, data_inicio, meses=1):
+    return gerar_escala_codificada(
+        agrupar_funcionarios_por_funcao(empresa.funcionarios['Turno 1']), data_inicio, '', meses=meses,
+        minimos={'Caixa': EFETIVO_MINIMO[('Caixa', 'Turno 1')]}
+    )
+
+class TestEfetivo(unittest.TestCase):
+    def test_ancoras_gravadas_cobrem_o_minimo_em_qualquer_periodo(self):
+        # Todos cadastrados no mesmo dia: sem ajuste, folgariam juntos
+        empresa = montar_empresa(['2026-10-01'] * 12)
+        self.assertTrue(gerar(empresa, '2026-11-01').faltas)
+
+        ancoras_ciclo = otimizar_ancoras_efetivo(empresa, data_inicio='2026-11-01')
+        self.assertTrue(ancoras_ciclo)
+        gravar_ancoras(empresa, ancoras_ciclo)
+        dois_meses = gerar(empresa, '2026-11-01', meses=2)
+        self.assertEqual(dois_meses.faltas, {})
+
+        # Meses gerados separadamente continuam o mesmo ciclo
+        novembro, dezembro = gerar(empresa, '2026-11-01'), gerar(empresa, '2026-12-01')
+        np.testing.assert_array_equal(np.concatenate([novembro.codigos, dezembro.codigos], axis=1), dois_meses.codigos)
+
+    def test_ancoras_que_ja_cobrem_nao_mudam(self):
+        empresa = montar_empresa([f'2026-10-{dia:02d}' for dia in range(1, 13)])
+        self.assertEqual(gerar(empresa, '2026-11-01', meses=3).faltas, {})
+        self.assertEqual(otimizar_ancoras_efetivo(empresa, data_inicio='2026-11-01'), {})
+
+        # Um funcionário a mais não mexe na fase de quem já estava escalado
+        antes = gerar(empresa, '2026-11-01').codigos
+        novo = Funcionario('C12', 'Caixa', 'C', '06:00 as 14:00', '2026-10-01', 'Turno 1', '2026-10-01')
+        novo.id = 13
+        empresa.adicionar_funcionario(novo)
+        self.assertEqual(otimizar_ancoras_efetivo(empresa, data_inicio='2026-11-01'), {})
+        np.testing.assert_array_equal(gerar(empresa, '2026-11-01').codigos[:12], antes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import random
+import unittest
+from escala_generator import gerar_escala_turnos_por_funcao, gerar_escala_turnos_por_funcao_vetorizada
+
+class TestEscalaVetorizada(unittest.TestCase):
+    # O motor vetorizado tem que reproduzir o laço original célula a célula
+    def test_equivalente_ao_laco(self):
+        aleatorio = random.Random(1)
+        ferias = "NCaixa3 (X) NFrentista1 (X)"
+        for ano in (2024, 2025, 2026):
+            for mes in range(1, 13):
+                data_inicio = f"{ano}-{mes:02d}-15"
+                funcionarios_por_funcao = {
+                    funcao: {
+                        f"N{funcao}{i} (X)": {'turno': 'Turno 1', 'horario': '06:00 as 14:00', 'data_inicio': data_inicio}
+                        for i in range(aleatorio.randint(0, 25))
+                    }
+                    for funcao in ("Caixa", "Frentista", "Gerente")
+                }
+                for dias_trabalho, dias_folga in ((5, 1), (6, 1), (4, 2)):
+                    with self.subTest(data_inicio=data_inicio, ciclo=(dias_trabalho, dias_folga)):
+                        self.assertEqual(
+                            gerar_escala_turnos_por_funcao(funcionarios_por_funcao, data_inicio, ferias, dias_trabalho, dias_folga),
+                            gerar_escala_turnos_por_funcao_vetorizada(funcionarios_por_funcao, data_inicio, ferias, dias_trabalho, dias_folga)
+                        )
+
+    def test_ferias_removem_linhas(self):
+        funcionarios_por_funcao = {'Caixa': {f"C{i}": {'turno': 'Turno 2', 'horario': '14:00 as 22:00'} for i in range(4)}}
+        escala = gerar_escala_turnos_por_funcao_vetorizada(funcionarios_por_funcao, "2026-02-01", "C1, C3")
+        self.assertEqual(list(escala['Caixa']), ['C0', 'C2'])
+        self.assertEqual(escala, gerar_escala_turnos_por_funcao(funcionarios_por_funcao, "2026-02-01", "C1, C3"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+from escala_generator import gerar_escala_codificada, gerar_escala_horizonte
+
+def funcionarios_ancorados(quantidade):
+    return {
+        'Frentista': {
+            f'F{i}': {'turno': 'Turno 1', 'horario': '06:00 as 14:00', 'ancora_ciclo': f'2026-01-{i % 28 + 1:02d}'}
+            for i in range(quantidade)
+        }
+    }
+
+def celulas_na_data(escala, data):
+    dia = int((np.datetime64(data, 'D') - escala.calendario.datas[0]).astype(np.int64))
+    return escala.codigos[:, dia]
+
+class TestHorizonte(unittest.TestCase):
+    # Com âncoras, a escala de uma data não depende de onde o horizonte começa nem de quantos dias ele tem
+    def test_horizontes_sobrepostos_concordam(self):
+        funcionarios_por_funcao = funcionarios_ancorados(12)
+        referencia = gerar_escala_codificada(funcionarios_por_funcao, '2026-11-01', '', meses=2)
+        for data_inicio, num_dias in (('2026-11-15', 30), ('2026-11-30', 10), ('2026-12-06', 26), ('2026-11-01', 45)):
+            with self.subTest(data_inicio=data_inicio, num_dias=num_dias):
+                escala = gerar_escala_horizonte(funcionarios_por_funcao, data_inicio, '', num_dias=num_dias)
+                for data in escala.calendario.datas:
+                    np.testing.assert_array_equal(celulas_na_data(escala, data), celulas_na_data(referencia, data))
+
+    def test_meses_separados_continuam_o_ciclo(self):
+        funcionarios_por_funcao = funcionarios_ancorados(12)
+        dois_meses = gerar_escala_codificada(funcionarios_por_funcao, '2026-11-01', '', meses=2)
+        novembro = gerar_escala_codificada(funcionarios_por_funcao, '2026-11-01', '')
+        dezembro = gerar_escala_codificada(funcionarios_por_funcao, '2026-12-01', '')
+        np.testing.assert_array_equal(np.concatenate([novembro.codigos, dezembro.codigos], axis=1), dois_meses.codigos)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+import unittest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Camadas que rodam sem interface (CLI, lote, persistência) não podem carregar o Streamlit nem o pandas
+MODULOS_SEM_INTERFACE = ('data_manager', 'escala_generator', 'escalas')
+PROIBIDOS = ('streamlit', 'pandas')
+
+class TestImportacoes(unittest.TestCase):
+    def test_modulos_sem_interface_nao_importam_streamlit_nem_pandas(self):
+        for modulo in MODULOS_SEM_INTERFACE:
+            with self.subTest(modulo=modulo):
+                # Processo novo, para que nada importado por outros testes mascare o resultado
+                saida = subprocess.run(
+                    [sys.executable, '-c',
+                     f"import sys, {modulo}; print(' '.join(m for m in {PROIBIDOS!r} if m in sys.modules))"],
+                    cwd=RAIZ, capture_output=True, text=True, check=True
+                )
+                self.assertEqual(saida.stdout.strip(), '')
+
+if __name__ == '__main__':
+    unittest.main()
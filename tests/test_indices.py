@@ -0,0 +1,85 @@
+import random
+import unittest
+from datetime import date, timedelta
+import numpy as np
+from escala_generator import TRABALHO, IndiceCobertura, IndiceFerias, gerar_escala_turno, obter_calendario
+from models import Empresa, Funcionario
+
+class TestIndiceFerias(unittest.TestCase):
+    # A máscara tem que marcar exatamente os dias do horizonte cobertos por algum período da linha
+    def test_mascara_igual_a_forca_bruta(self):
+        aleatorio = random.Random(14)
+        calendario = obter_calendario('2026-11-10', 30)
+        inicio_calendario = date(2026, 11, 10)
+        num_linhas = 8
+        periodos_por_linha = []
+        for _ in range(num_linhas):
+            periodos = []
+            for _ in range(aleatorio.randint(0, 3)):
+                # Começa até 20 dias antes e termina até 20 dias depois do horizonte, com sobreposições
+                inicio = inicio_calendario + timedelta(days=aleatorio.randint(-20, 45))
+                fim = inicio + timedelta(days=aleatorio.randint(0, 25))
+                periodos.append((inicio.isoformat(), fim.isoformat()))
+            periodos_por_linha.append(periodos)
+        # Casos de borda fixos: cobre o horizonte inteiro, termina no primeiro dia, começa no último,
+        # períodos repetidos e um período inteiro fora do horizonte
+        periodos_por_linha[0] = [('2026-11-01', '2026-12-31')]
+        periodos_por_linha[1] = [('2026-11-01', '2026-11-10'), ('2026-12-09', '2026-12-20')]
+        periodos_por_linha[2] = [('2026-11-15', '2026-11-20'), ('2026-11-15', '2026-11-20'), ('2026-11-18', '2026-11-22')]
+        periodos_por_linha[3] = [('2026-10-01', '2026-11-09'), ('2026-12-10', '2026-12-31')]
+
+        esperado = np.array([
+            [
+                any(inicio <= (inicio_calendario + timedelta(days=dia)).isoformat() <= fim for inicio, fim in periodos)
+                for dia in range(calendario.num_dias)
+            ]
+            for periodos in periodos_por_linha
+        ])
+        mascara = IndiceFerias.de_periodos(periodos_por_linha).mascara(num_linhas, calendario)
+        np.testing.assert_array_equal(mascara, esperado)
+        self.assertTrue(mascara[0].all())
+        self.assertEqual(np.flatnonzero(mascara[1]).tolist(), [0, 29])
+        self.assertFalse(mascara[3].any())
+
+class TestIndiceCobertura(unittest.TestCase):
+    def setUp(self):
+        empresa = Empresa('Posto Índice')
+        funcoes = ['Caixa', 'Frentista', 'Gerente']
+        for i in range(45):
+            empresa.adicionar_funcionario(Funcionario(
+                f'N{i}', funcoes[i % 3], 'A', '06:00 as 14:00', f'2026-10-{i % 9 + 1:02d}', f'Turno {i % 2 + 1}',
+                ferias=[('2026-11-05', '2026-11-12')] if i % 7 == 0 else None
+            ))
+        self.escalas = [gerar_escala_turno(empresa, turno, '2026-11-01', '') for turno in ('Turno 1', 'Turno 2')]
+        self.cobertura = IndiceCobertura(self.escalas)
+
+    # Cada consulta tem que devolver as mesmas linhas que uma varredura direta das matrizes
+    def test_consultas_iguais_a_forca_bruta(self):
+        cobertura = self.cobertura
+        codigos = np.concatenate([escala.codigos for escala in self.escalas])
+        for dia in range(cobertura.calendario.num_dias):
+            for turno in (None, 'Turno 1', 'Turno 2', 'Turno 3'):
+                for funcao in (None, 'Caixa', 'Frentista', 'Gerente', 'Lavador'):
+                    linhas = [
+                        linha for linha in range(len(cobertura.nomes))
+                        if turno in (None, cobertura.turnos[linha]) and funcao in (None, cobertura.funcoes[linha])
+                    ]
+                    trabalhando = [linha for linha in linhas if codigos[linha, dia] == TRABALHO]
+                    ausentes = [linha for linha in linhas if codigos[linha, dia] != TRABALHO]
+                    self.assertEqual(sorted(cobertura.trabalhando(dia, turno, funcao).tolist()), trabalhando)
+                    self.assertEqual(sorted(cobertura.ausentes(dia, turno, funcao).tolist()), ausentes)
+                    if turno is not None and funcao is not None:
+                        self.assertEqual(cobertura.contagem(dia, turno, funcao), (len(trabalhando), len(ausentes)))
+        data = str(cobertura.calendario.datas[10])
+        self.assertEqual(cobertura.ausentes(data).tolist(), cobertura.ausentes(10).tolist())
+
+    def test_dia_fora_do_horizonte(self):
+        for dia in (-1, 30, '2026-10-31', '2026-12-01'):
+            with self.subTest(dia=dia):
+                with self.assertRaises(ValueError):
+                    self.cobertura.trabalhando(dia)
+                with self.assertRaises(ValueError):
+                    self.cobertura.contagem(dia, 'Turno 1', 'Caixa')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import random
+import unittest
+from models import Empresa, Funcionario
+from escala_generator import gerar_escala_turno, obter_colunas_dias
+from utils import obter_dataframe_escala
+from validacao_escala import interpretar_rotulo, validar_escala_editada, validar_dataframe_escala
+
+ROTULOS_EDITADOS = ['Folga', 'Turno 1: 22:00 as 06:00', 'Turno 1: 05:00 as 13:00', '22:00 as 06:00', None, 'sem horário']
+
+class TestValidacaoEscala(unittest.TestCase):
+    # Validar pela escala codificada (jornadas + células editadas) tem que dar o mesmo que reinterpretar o texto
+    def test_escala_editada_equivale_ao_dataframe(self):
+        empresa = Empresa('Posto')
+        for i in range(40):
+            empresa.adicionar_funcionario(Funcionario(
+                f'F{i}', 'Caixa', 'C', ['06:00 as 14:00', '22:00 as 06:00'][i % 2], '2026-01-01', 'Turno 1', f'2026-01-{i % 28 + 1:02d}'
+            ))
+        aleatorio = random.Random(3)
+        for meses in (1, 2):
+            escala = gerar_escala_turno(empresa, 'Turno 1', '2026-10-01', '', meses=meses)
+            colunas_dias = obter_colunas_dias(escala.calendario)
+            for _ in range(20):
+                linhas_editadas = {}
+                for _ in range(aleatorio.randint(0, 15)):
+                    linhas_editadas.setdefault(aleatorio.randrange(40), {})[aleatorio.choice(colunas_dias)] = aleatorio.choice(ROTULOS_EDITADOS)
+                df_escala = obter_dataframe_escala(escala).astype(object)
+                for linha, colunas in linhas_editadas.items():
+                    for coluna, rotulo in colunas.items():
+                        df_escala.at[linha, coluna] = rotulo
+                self.assertTrue((
+                    validar_escala_editada(escala, linhas_editadas) == validar_dataframe_escala(df_escala, escala.calendario, colunas_dias)
+                ).all())
+    def test_rotulos_com_e_sem_turno(self):
+        self.assertEqual(interpretar_rotulo('22:00 as 06:00'), (True, 22 * 60, 30 * 60))
+        self.assertEqual(interpretar_rotulo('Turno 3: 22:00 as 06:00'), (True, 22 * 60, 30 * 60))
+        self.assertEqual(interpretar_rotulo('sem horário'), (True, -1, -1))
+        self.assertEqual(interpretar_rotulo('Folga'), (False, -1, -1))
+
+if __name__ == '__main__':
+    unittest.main()
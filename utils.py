@@ -1,4 +1,7 @@
+from functools import lru_cache
+import numpy as np
 import pandas as pd
+from escala_generator import TRABALHO, ROTULOS, obter_colunas_dias
 
 def transformar_escala_para_dataframe(escala_por_funcao, num_dias_no_mes):
     colunas = ['Funcionário'] + [f'Dia {i+1}' for i in range(num_dias_no_mes)]
@@ -11,6 +14,65 @@ def transformar_escala_para_dataframe(escala_por_funcao, num_dias_no_mes):
 
     return pd.DataFrame(dados, columns=colunas)
 
+def transformar_escala_codificada_para_dataframe(escala):
+    # Categorias fixas (folgas e férias) seguidas dos rótulos de trabalho de cada turno/horário
+    codigos_fixos = sorted(ROTULOS)
+    rotulos_trabalho = [f"{turno}: {horario}" for turno, horario in zip(escala.turnos, escala.horarios)]
+    indice_trabalho, categorias_trabalho = pd.factorize(pd.Series(rotulos_trabalho, dtype=object))
+    categorias = [ROTULOS[codigo] for codigo in codigos_fixos] + list(categorias_trabalho)
+
+    mapa_fixos = np.zeros(max(codigos_fixos) + 1, dtype=np.int32)
+    mapa_fixos[codigos_fixos] = np.arange(len(codigos_fixos))
+    codigos_categoria = np.where(
+        escala.codigos == TRABALHO,
+        len(codigos_fixos) + indice_trabalho[:, np.newaxis],
+        mapa_fixos[escala.codigos]
+    )
+
+    # Células editadas com um rótulo de trabalho diferente do padrão da linha
+    for (linha, dia), rotulo in escala.ajustes.items():
+        if rotulo not in categorias:
+            categorias.append(rotulo)
+        codigos_categoria[linha, dia] = categorias.index(rotulo)
+
+    dados = {'Funcionário': escala.nomes}
+    for dia, coluna in enumerate(obter_colunas_dias(escala.calendario)):
+        dados[coluna] = pd.Categorical.from_codes(codigos_categoria[:, dia], categories=categorias)
+
+    return pd.DataFrame(dados)
+
+# As escalas em cache são reaproveitadas entre execuções, então o DataFrame de cada uma também pode ser
+@lru_cache(maxsize=64)
+def obter_dataframe_escala(escala):
+    return transformar_escala_codificada_para_dataframe(escala)
+
+def filtrar_linhas_escala(escala, funcoes=None, busca=''):
+    # Índices das linhas que passam pelos filtros de função e de nome (sem diferenciar maiúsculas)
+    selecionadas = np.ones(len(escala.nomes), dtype=bool)
+    if funcoes:
+        selecionadas &= np.isin(np.array(escala.funcoes, dtype=object), list(funcoes))
+    if busca:
+        selecionadas &= pd.Series(escala.nomes, dtype=object).str.contains(busca, case=False, regex=False).to_numpy()
+    return np.flatnonzero(selecionadas)
+
+def paginar(linhas, pagina, tamanho_pagina):
+    # Páginas começam em 1; retorna as linhas da página e o total de páginas
+    total_paginas = max(1, -(-len(linhas) // tamanho_pagina))
+    pagina = min(max(pagina, 1), total_paginas)
+    return linhas[(pagina - 1) * tamanho_pagina:pagina * tamanho_pagina], total_paginas
+
+def concatenar_dataframes_escala(lista_dataframes):
+    # Unifica as categorias de cada dia para que o pd.concat mantenha as colunas categóricas
+    lista_dataframes = [df.copy() for df in lista_dataframes]
+    for coluna in lista_dataframes[0].columns:
+        if not all(coluna in df and isinstance(df[coluna].dtype, pd.CategoricalDtype) for df in lista_dataframes):
+            continue
+        categorias = pd.api.types.union_categoricals([df[coluna] for df in lista_dataframes]).categories
+        for df in lista_dataframes:
+            df[coluna] = df[coluna].cat.set_categories(categorias)
+
+    return pd.concat(lista_dataframes, ignore_index=True)
+
 funcoes_familias = {
     "Caixa": "C",
     "Frentista": "F",
@@ -20,4 +82,5 @@ funcoes_familias = {
     "Zelador": "Z"
 }
 
-turnos_funcionarios = ["Turno 1", "Turno 2", "Turno 3"]
\ No newline at end of file
+turnos_funcionarios = ["Turno 1", "Turno 2", "Turno 3"]
+dias_semana = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
@@ -0,0 +1,127 @@
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from escala_generator import ROTULOS, TRABALHO, obter_colunas_dias
+from models import interpretar_horario
+
+# Regras trabalhistas verificadas
+DESCANSO_MINIMO_MINUTOS = 11 * 60
+MAX_DIAS_CONSECUTIVOS = 6
+DOMINGOS_FOLGA_POR_MES = 1
+
+# Bits da matriz de violações
+VIOLACAO_DESCANSO = 1
+VIOLACAO_DIAS_CONSECUTIVOS = 2
+VIOLACAO_DOMINGO = 4
+
+MENSAGENS = {
+    VIOLACAO_DESCANSO: 'Descanso menor que 11h desde o turno anterior',
+    VIOLACAO_DIAS_CONSECUTIVOS: 'Dias de trabalho consecutivos acima do limite',
+    VIOLACAO_DOMINGO: 'Mês sem domingo de folga',
+}
+
+_rotulos_ausencia = frozenset(ROTULOS.values())
+
+@lru_cache(maxsize=None)
+def interpretar_rotulo(rotulo):
+    # Retorna (trabalha, inicio, fim); células de trabalho sem horário reconhecível ficam com -1
+    if not isinstance(rotulo, str) or rotulo in _rotulos_ausencia:
+        return False, -1, -1
+    # O horário é procurado no rótulo inteiro: 'Turno 1: 22:00 as 06:00' e '22:00 as 06:00' valem igual
+    jornada = interpretar_horario(rotulo)
+    if jornada is None:
+        return True, -1, -1
+    return True, jornada.inicio, jornada.fim
+
+def _tabela_rotulos(rotulos):
+    return np.array([interpretar_rotulo(rotulo) for rotulo in rotulos], dtype=np.int32).reshape(-1, 3)
+
+def matrizes_de_dataframe(df_escala, colunas_dias):
+    # Cada rótulo distinto é interpretado uma vez; as matrizes saem por indexação.
+    # Colunas categóricas usam os próprios códigos, sem materializar as strings.
+    celulas = np.empty((len(df_escala), len(colunas_dias), 3), dtype=np.int32)
+    for dia, coluna in enumerate(colunas_dias):
+        valores = df_escala[coluna]
+        if isinstance(valores.dtype, pd.CategoricalDtype):
+            # O código -1 (valor ausente) cai na última linha da tabela, que é uma ausência
+            tabela = _tabela_rotulos(list(valores.cat.categories) + [None])
+            celulas[:, dia] = tabela[valores.cat.codes.to_numpy()]
+        else:
+            indices, rotulos = pd.factorize(valores.to_numpy(dtype=object), use_na_sentinel=False)
+            celulas[:, dia] = _tabela_rotulos(rotulos)[indices]
+    return celulas[..., 0].astype(bool), celulas[..., 1], celulas[..., 2]
+
+def matrizes_de_escala(escala):
+    # Direto da matriz codificada: os minutos vêm da jornada de cada linha, sem texto
+    trabalho = escala.codigos == TRABALHO
+    inicios = np.array([jornada.inicio if jornada else -1 for jornada in escala.jornadas], dtype=np.int32)
+    fins = np.array([jornada.fim if jornada else -1 for jornada in escala.jornadas], dtype=np.int32)
+    inicios = np.where(trabalho, inicios[:, np.newaxis], -1)
+    fins = np.where(trabalho, fins[:, np.newaxis], -1)
+    for (linha, dia), rotulo in escala.ajustes.items():
+        trabalho[linha, dia], inicios[linha, dia], fins[linha, dia] = interpretar_rotulo(rotulo)
+    return trabalho, inicios, fins
+
+def _dias_consecutivos(trabalho):
+    # Tamanho da sequência de trabalho que termina em cada célula
+    acumulado = np.cumsum(trabalho, axis=1)
+    reinicio = np.maximum.accumulate(np.where(trabalho, 0, acumulado), axis=1)
+    return acumulado - reinicio
+
+def validar_escala(trabalho, inicios, fins, calendario,
+                   descanso_minimo=DESCANSO_MINIMO_MINUTOS, max_dias_consecutivos=MAX_DIAS_CONSECUTIVOS,
+                   domingos_folga_por_mes=DOMINGOS_FOLGA_POR_MES):
+    violacoes = np.zeros(trabalho.shape, dtype=np.uint8)
+
+    # Descanso entre o fim de um dia e o início do seguinte (o dia seguinte começa 1440 minutos depois)
+    com_horario = trabalho & (inicios >= 0)
+    seguidos = com_horario[:, :-1] & com_horario[:, 1:]
+    descanso = inicios[:, 1:] + 24 * 60 - fins[:, :-1]
+    violacoes[:, 1:] |= np.where(seguidos & (descanso < descanso_minimo), VIOLACAO_DESCANSO, 0).astype(np.uint8)
+
+    violacoes |= np.where(_dias_consecutivos(trabalho) > max_dias_consecutivos, VIOLACAO_DIAS_CONSECUTIVOS, 0).astype(np.uint8)
+
+    # Domingos de folga por mês, só nos meses cobertos do primeiro ao último dia pelo calendário
+    domingos = np.flatnonzero(calendario.ordem_domingo >= 0)
+    if len(domingos):
+        datas_inicio = calendario.datas[calendario.inicios_meses]
+        datas_fim = calendario.datas[np.r_[calendario.inicios_meses[1:] - 1, calendario.num_dias - 1]]
+        completos = (datas_inicio == datas_inicio.astype('datetime64[M]')) & (
+            (datas_fim + np.timedelta64(1, 'D')).astype('datetime64[M]') != datas_fim.astype('datetime64[M]')
+        )
+        meses = calendario.indice_mes[domingos]
+        mes_do_domingo = meses[:, np.newaxis] == np.arange(len(completos))
+        folgas = (~trabalho[:, domingos]).astype(np.int64) @ mes_do_domingo
+        sem_folga = (folgas < domingos_folga_por_mes) & completos
+        marcados = sem_folga[:, meses] & trabalho[:, domingos]
+        violacoes[:, domingos] |= np.where(marcados, VIOLACAO_DOMINGO, 0).astype(np.uint8)
+
+    return violacoes
+
+def validar_dataframe_escala(df_escala, calendario, colunas_dias, **regras):
+    trabalho, inicios, fins = matrizes_de_dataframe(df_escala, colunas_dias)
+    return validar_escala(trabalho, inicios, fins, calendario, **regras)
+
+def validar_escala_editada(escala, linhas_editadas, **regras):
+    # Escala codificada mais o delta do st.data_editor ({linha: {coluna: rótulo}}): só as células
+    # editadas são interpretadas a partir do texto
+    trabalho, inicios, fins = matrizes_de_escala(escala)
+    indice_colunas = {coluna: dia for dia, coluna in enumerate(obter_colunas_dias(escala.calendario))}
+    for linha, colunas in linhas_editadas.items():
+        for coluna, rotulo in colunas.items():
+            if coluna in indice_colunas:
+                dia = indice_colunas[coluna]
+                trabalho[int(linha), dia], inicios[int(linha), dia], fins[int(linha), dia] = interpretar_rotulo(rotulo)
+    return validar_escala(trabalho, inicios, fins, escala.calendario, **regras)
+
+def listar_violacoes(violacoes, nomes, colunas_dias):
+    linhas, dias = np.nonzero(violacoes)
+    return pd.DataFrame(
+        [
+            (nomes[linha], colunas_dias[dia], mensagem)
+            for linha, dia in zip(linhas.tolist(), dias.tolist())
+            for bit, mensagem in MENSAGENS.items()
+            if violacoes[linha, dia] & bit
+        ],
+        columns=['Funcionário', 'Dia', 'Regra']
+    )